@@ -1,134 +1,159 @@
 import sqlite3
 import os
+import sys
+import logging
 
 DB_PATH = "services/control-plane/test.db"
 
-def migrate_db():
-    if not os.path.exists(DB_PATH):
-        print(f"Database not found at {DB_PATH}")
-        return
+log = logging.getLogger("migrations")
+
+# Stored in PRAGMA user_version once migrate_db() succeeds; bump it whenever
+# COLUMNS or the table definitions below change
+TARGET_VERSION = 1
+
+# WAL + synchronous=NORMAL so the whole migration costs a single fsync
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA cache_size=-20000;"
+)
 
-    print(f"Migrating database at {DB_PATH}...")
+# (table, column, type, default) for every column added after table creation
+COLUMNS = [
+    ("deployment", "ssh_connection_string", "TEXT", None),
+    ("deployment", "ssh_password", "TEXT", None),
+    # New fields for Phase 1 UI Enhancements
+    ("deployment", "vcpu_count", "INTEGER", None),
+    ("deployment", "ram_gb", "INTEGER", None),
+    ("deployment", "storage_gb", "INTEGER", None),
+    ("deployment", "uptime_seconds", "INTEGER", None),
+    ("deployment", "gpu_utilization", "INTEGER", None),
+    ("deployment", "gpu_memory_utilization", "INTEGER", None),
+]
+
+# Tables created by this migration when missing
+TABLES = {
+    "activitylog": """
+        CREATE TABLE activitylog (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deployment_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            status TEXT NOT NULL,
+            details TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(deployment_id) REFERENCES deployment(id)
+        )""",
+    "provider": """
+        CREATE TABLE provider (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            type TEXT NOT NULL,
+            api_key TEXT,
+            config_json TEXT,
+            is_enabled BOOLEAN DEFAULT 1,
+            weight INTEGER DEFAULT 100,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+    "systemsetting": """
+        CREATE TABLE systemsetting (
+            "key" TEXT NOT NULL PRIMARY KEY,
+            value TEXT NOT NULL,
+            description TEXT,
+            is_secret BOOLEAN DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+}
+
+def plan_statements(cursor):
+    """Diff the live schema against the target and return the DDL still needed"""
+    # Introspect the schema once up front
+    existing_tables = {
+        row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    }
+    cols = {
+        table: {info[1] for info in cursor.execute(f"PRAGMA table_info({table})")}
+        for table in ("deployment", "user")
+    }
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    statements = []
     
-    try:
-        # Check if columns exist
-        cursor.execute("PRAGMA table_info(deployment)")
-        columns = [info[1] for info in cursor.fetchall()]
-        
-        if "ssh_connection_string" not in columns:
-            print("Adding ssh_connection_string column...")
-            cursor.execute("ALTER TABLE deployment ADD COLUMN ssh_connection_string TEXT")
-        else:
-            print("ssh_connection_string column already exists.")
-            
-        if "ssh_password" not in columns:
-            print("Adding ssh_password column...")
-            cursor.execute("ALTER TABLE deployment ADD COLUMN ssh_password TEXT")
-        else:
-            print("ssh_password column already exists.")
-            
-        # New fields for Phase 1 UI Enhancements
-        if "vcpu_count" not in columns:
-            print("Adding vcpu_count column...")
-            cursor.execute("ALTER TABLE deployment ADD COLUMN vcpu_count INTEGER")
-            
-        if "ram_gb" not in columns:
-            print("Adding ram_gb column...")
-            cursor.execute("ALTER TABLE deployment ADD COLUMN ram_gb INTEGER")
-            
-        if "storage_gb" not in columns:
-            print("Adding storage_gb column...")
-            cursor.execute("ALTER TABLE deployment ADD COLUMN storage_gb INTEGER")
-            
-        if "uptime_seconds" not in columns:
-            print("Adding uptime_seconds column...")
-            cursor.execute("ALTER TABLE deployment ADD COLUMN uptime_seconds INTEGER")
-            
-        if "gpu_utilization" not in columns:
-            print("Adding gpu_utilization column...")
-            cursor.execute("ALTER TABLE deployment ADD COLUMN gpu_utilization INTEGER")
-            
-        if "gpu_memory_utilization" not in columns:
-            print("Adding gpu_memory_utilization column...")
-            cursor.execute("ALTER TABLE deployment ADD COLUMN gpu_memory_utilization INTEGER")
-            
-        # Create ActivityLog table if not exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='activitylog'")
-        if not cursor.fetchone():
-            print("Creating activitylog table...")
-            cursor.execute("""
-                CREATE TABLE activitylog (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    deployment_id INTEGER NOT NULL,
-                    action TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    details TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(deployment_id) REFERENCES deployment(id)
-                )
-            """)
+    # Add any missing columns in declaration order
+    missing = [spec for spec in COLUMNS if spec[1] not in cols[spec[0]]]
+    for table, column, col_type, default in missing:
+        log.info("Adding %s.%s column...", table, column)
+        default_sql = f" DEFAULT {default}" if default is not None else ""
+        statements.append(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}{default_sql}")
+    if not missing:
+        log.info("deployment columns already exist.")
+    
+    # Create missing tables
+    for table, ddl in TABLES.items():
+        if table not in existing_tables:
+            log.info("Creating %s table...", table)
+            statements.append(ddl)
         else:
-            print("activitylog table already exists.")
+            log.info("%s table already exists.", table)
+    
+    # Add clerk_id to User table if not exists
+    if "clerk_id" not in cols["user"]:
+        log.info("Adding clerk_id column to user table...")
+        statements.append("ALTER TABLE user ADD COLUMN clerk_id TEXT")
+        # SQLite doesn't support adding UNIQUE constraints via ALTER TABLE easily without recreating, 
+        # but we can add a unique index
+        statements.append("CREATE UNIQUE INDEX IF NOT EXISTS ix_user_clerk_id ON user (clerk_id)")
+    else:
+        log.info("user.clerk_id column already exists.")
+    
+    return statements
 
-        # Create Provider table if not exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='provider'")
-        if not cursor.fetchone():
-            print("Creating provider table...")
-            cursor.execute("""
-                CREATE TABLE provider (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    type TEXT NOT NULL,
-                    api_key TEXT,
-                    config_json TEXT,
-                    is_enabled BOOLEAN DEFAULT 1,
-                    weight INTEGER DEFAULT 100,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-        else:
-            print("provider table already exists.")
-            
-        # Create SystemSetting table if not exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='systemsetting'")
-        if not cursor.fetchone():
-            print("Creating systemsetting table...")
-            cursor.execute("""
-                CREATE TABLE systemsetting (
-                    "key" TEXT NOT NULL PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    description TEXT,
-                    is_secret BOOLEAN DEFAULT 0,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-        else:
-            print("systemsetting table already exists.")
+def build_script(cursor):
+    """Render the pending migration as one SQL script, e.g. for `sqlite3 test.db < migration.sql`"""
+    lines = [PRAGMAS, "BEGIN IMMEDIATE;"]
+    lines += [f"{statement.strip()};" for statement in plan_statements(cursor)]
+    lines += [f"PRAGMA user_version={TARGET_VERSION};", "COMMIT;"]
+    return "\n".join(lines)
 
-        # Add clerk_id to User table if not exists
-        cursor.execute("PRAGMA table_info(user)")
-        user_columns = [info[1] for info in cursor.fetchall()]
-        if "clerk_id" not in user_columns:
-            print("Adding clerk_id column to user table...")
-            cursor.execute("ALTER TABLE user ADD COLUMN clerk_id TEXT")
-            # SQLite doesn't support adding UNIQUE constraints via ALTER TABLE easily without recreating, 
-            # but we can add a unique index
-            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_user_clerk_id ON user (clerk_id)")
-        else:
-            print("user.clerk_id column already exists.")
+def migrate_db(dry_run=False):
+    if not os.path.exists(DB_PATH):
+        log.warning("Database not found at %s", DB_PATH)
+        return
 
-        conn.commit()
-        print("✅ Database migration completed successfully!")
+    log.info("Migrating database at %s...", DB_PATH)
+    
+    # Autocommit mode: transactions are managed explicitly below, so the
+    # sqlite3 module never commits behind our back around DDL
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    cursor = conn.cursor()
+    
+    # Fast path: schema already at the target version
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    if version >= TARGET_VERSION:
+        log.info("Database schema already at version %d, nothing to do.", version)
+        conn.close()
+        return
+    
+    if dry_run:
+        print(build_script(cursor))
+        conn.close()
+        return
+    
+    try:
+        # One script, one transaction: executescript() would implicitly commit
+        # a transaction opened outside it, so BEGIN/COMMIT live in the script
+        cursor.executescript(build_script(cursor))
+        log.info("✅ Database migration completed successfully!")
         
     except Exception as e:
-        print(f"❌ Migration failed: {e}")
-        conn.rollback()
+        log.error("❌ Migration failed: %s", e)
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
     finally:
+        # Refresh query-planner stats for subsequent connections
+        conn.execute("PRAGMA optimize")
         conn.close()
 
 if __name__ == "__main__":
-    migrate_db()
+    logging.basicConfig(level=os.environ.get("MIGRATION_LOG", "WARNING"), format="%(message)s")
+    migrate_db(dry_run="--dry-run" in sys.argv)
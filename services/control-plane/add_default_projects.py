@@ -7,56 +7,41 @@ that don't have one yet.
 
 import sys
 import os
+import logging
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlmodel import Session, create_engine, text
-from dotenv import load_dotenv
+from sqlmodel import text
+from migrations._engine import get_engine
 
-load_dotenv()
+log = logging.getLogger("migrations")
 
-def get_database_url():
-    return os.getenv("DATABASE_URL", "sqlite:///./test.db")
+_INSERT_DEFAULT_PROJECTS = text("""
+    INSERT INTO project (organization_id, name, description, created_by, created_at, updated_at)
+    SELECT o.id, 'Default', 'Default project for deployments', o.owner_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM organization o
+    WHERE NOT EXISTS (
+        SELECT 1 FROM project p WHERE p.organization_id = o.id AND p.name = 'Default'
+    )
+""")
 
 def add_default_projects():
     """Add default projects to all organizations"""
-    database_url = get_database_url()
-    if "sqlite" in database_url:
-        engine = create_engine(database_url, connect_args={"check_same_thread": False}, echo=False)
-    else:
-        engine = create_engine(database_url, echo=False)
+    engine = get_engine()
     
-    print("[Migration] Adding default projects to organizations...")
+    log.info("Adding default projects to organizations...")
     
-    with Session(engine) as session:
-        # Get all organizations
-        orgs = session.exec(text("SELECT id, name, owner_id FROM organization")).all()
+    with engine.begin() as conn:
+        # Insert a Default project for every organization lacking one in a single statement
+        result = conn.execute(_INSERT_DEFAULT_PROJECTS)
         
-        for org_id, org_name, owner_id in orgs:
-            # Check if organization already has a "Default" project
-            existing = session.exec(text(
-                "SELECT id FROM project WHERE organization_id = :org_id AND name = 'Default'"
-            ).bindparams(org_id=org_id)).first()
-            
-            if existing:
-                print(f"[Migration] Organization '{org_name}' already has a Default project")
-                continue
-            
-            # Create default project using raw SQL
-            session.exec(text("""
-                INSERT INTO project (organization_id, name, description, created_by, created_at, updated_at)
-                VALUES (:org_id, 'Default', 'Default project for deployments', :owner_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-            """).bindparams(org_id=org_id, owner_id=owner_id))
-            
-            print(f"[Migration] ✅ Created Default project for '{org_name}'")
-        
-        session.commit()
-        print("[Migration] ✅ Default projects added successfully!")
+        log.info("✅ Created %d Default project(s)", result.rowcount)
+    
+    log.info("✅ Default projects added successfully!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("MIGRATION_LOG", "WARNING"), format="[Migration] %(message)s")
     try:
         add_default_projects()
     except Exception as e:
-        print(f"\n[Migration ERROR] {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("ERROR: %s", e)
         sys.exit(1)
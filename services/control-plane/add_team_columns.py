@@ -4,52 +4,59 @@ Simple migration to add organization_id and project_id to deployment table
 
 import sys
 import os
+import logging
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlmodel import Session, create_engine, text
-from dotenv import load_dotenv
+from sqlmodel import text
+from migrations._engine import get_engine
 
-load_dotenv()
+log = logging.getLogger("migrations")
 
-def get_database_url():
-    return os.getenv("DATABASE_URL", "sqlite:///./test.db")
+_COLUMNS_QUERY = text("SELECT column_name FROM information_schema.columns WHERE table_name = :table")
+
+TEAM_COLUMNS = [
+    ("organization_id", "INTEGER REFERENCES organization(id)"),
+    ("project_id", "INTEGER REFERENCES project(id)"),
+]
+
+def get_existing_columns(conn, table: str) -> set:
+    """Read the column names of a table in one query"""
+    if conn.dialect.name == "sqlite":
+        return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+    
+    return {row[0] for row in conn.execute(_COLUMNS_QUERY, {"table": table})}
 
 def add_columns_to_deployment():
     """Add organization_id and project_id columns to deployment table"""
-    database_url = get_database_url()
-    if "sqlite" in database_url:
-        engine = create_engine(database_url, connect_args={"check_same_thread": False}, echo=False)
-    else:
-        engine = create_engine(database_url, echo=False)
+    engine = get_engine()
     
-    print("[Migration] Adding columns to deployment table...")
+    log.info("Adding columns to deployment table...")
     
-    with Session(engine) as session:
-        try:
-            # Add organization_id column
-            session.exec(text("""
-                ALTER TABLE deployment 
-                ADD COLUMN organization_id INTEGER REFERENCES organization(id)
-            """))
-            print("[Migration] ✅ Added organization_id column")
-        except Exception as e:
-            print(f"[Migration] organization_id column may already exist: {e}")
-            session.rollback()
+    # Both ALTERs share one transaction so a failure rolls back neither half-applied
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Postgres skips existing columns itself
+            statements = [
+                f"ALTER TABLE deployment ADD COLUMN IF NOT EXISTS {name} {ddl}"
+                for name, ddl in TEAM_COLUMNS
+            ]
+        else:
+            existing = get_existing_columns(conn, "deployment")
+            statements = [
+                f"ALTER TABLE deployment ADD COLUMN {name} {ddl}"
+                for name, ddl in TEAM_COLUMNS if name not in existing
+            ]
         
-        try:
-            # Add project_id column
-            session.exec(text("""
-                ALTER TABLE deployment 
-                ADD COLUMN project_id INTEGER REFERENCES project(id)
-            """))
-            print("[Migration] ✅ Added project_id column")
-        except Exception as e:
-            print(f"[Migration] project_id column may already exist: {e}")
-            session.rollback()
+        for statement in statements:
+            conn.exec_driver_sql(statement)
         
-        session.commit()
+        if statements:
+            log.info("✅ Applied %d column statement(s)", len(statements))
+        else:
+            log.info("organization_id and project_id columns already exist")
     
-    print("[Migration] ✅ Deployment table updated")
+    log.info("✅ Deployment table updated")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("MIGRATION_LOG", "WARNING"), format="[Migration] %(message)s")
     add_columns_to_deployment()
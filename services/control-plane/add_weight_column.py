@@ -1,32 +1,43 @@
+import logging
+import os
 import sqlite3
+import sys
 from pathlib import Path
 
+log = logging.getLogger("migrations")
+
+VERIFY = "--verify" in sys.argv
+
+# Verification output is requested explicitly, so show it at the default level
+logging.basicConfig(
+    level=os.environ.get("MIGRATION_LOG", "INFO" if VERIFY else "WARNING"),
+    format="[Migration] %(message)s"
+)
+
 # Connect to database
 db_path = Path(__file__).parent / "test.db"
 conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-# Check if weight column exists
-cursor.execute("PRAGMA table_info(provider)")
-columns = cursor.fetchall()
-column_names = [col[1] for col in columns]
-
-if 'weight' not in column_names:
-    print("Adding weight column to provider table...")
-    try:
-        cursor.execute("ALTER TABLE provider ADD COLUMN weight INTEGER DEFAULT 100")
-        conn.commit()
-        print("✅ Successfully added weight column")
-    except Exception as e:
-        print(f"❌ Error adding column: {e}")
-else:
-    print("✅ Weight column already exists")
-
-# Verify
-cursor.execute("PRAGMA table_info(provider)")
-columns = cursor.fetchall()
-print("\nCurrent provider table columns:")
-for col in columns:
-    print(f"  - {col[1]} ({col[2]})")
+
+# Check and add the weight column in a single transaction
+try:
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        column_names = {col[1] for col in conn.execute("PRAGMA table_info(provider)")}
+
+        if 'weight' not in column_names:
+            log.info("Adding weight column to provider table...")
+            conn.execute("ALTER TABLE provider ADD COLUMN weight INTEGER DEFAULT 100")
+            log.info("✅ Successfully added weight column")
+        else:
+            log.info("✅ Weight column already exists")
+except Exception as e:
+    log.exception("❌ Error adding column: %s", e)
+
+# Verify (opt-in via --verify)
+if VERIFY:
+    columns = conn.execute("PRAGMA table_info(provider)").fetchall()
+    log.info("Current provider table columns:")
+    for col in columns:
+        log.info("  - %s (%s)", col[1], col[2])
 
 conn.close()
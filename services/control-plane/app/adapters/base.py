@@ -1,5 +1,8 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from collections import defaultdict
+from typing import Dict, Any, Optional, Tuple, List
 
 class ProviderAdapter(ABC):
     @abstractmethod
@@ -87,8 +90,40 @@ class ProviderAdapter(ABC):
             - network_tx_bytes: Network transmitted bytes
         """
         pass
+    
+    @staticmethod
+    async def gather_pricing(
+        requests: List[Tuple["ProviderAdapter", str]],
+        concurrency: int = 8
+    ) -> List[Any]:
+        """
+        Fetch prices for several (adapter, gpu_type) pairs concurrently
+        
+        Returns one entry per pair, in order: the price (or None), or the
+        exception raised by that adapter.
+        """
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def one(adapter: "ProviderAdapter", gpu_type: str):
+            async with sem:
+                return await adapter.get_pricing(gpu_type)
+        
+        return await asyncio.gather(*(one(a, g) for a, g in requests), return_exceptions=True)
+
+
+# Shared availability cache: (provider name, gpu_type) -> (result, expires_at)
+_availability_cache: Dict[Tuple[str, str], Tuple[Dict[str, Any], float]] = {}
+_availability_locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+AVAILABILITY_CACHE_TTL_SECONDS = 30
 
 
+def _get_cached_availability(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    cached = _availability_cache.get(key)
+    if cached and cached[1] > time.monotonic():
+        # Copy so callers can't mutate the shared entry
+        return dict(cached[0])
+    return None
+
 
 class ProviderAdapterTemplate(ProviderAdapter):
     """
@@ -116,6 +151,14 @@ class ProviderAdapterTemplate(ProviderAdapter):
                 return GPU_TYPE_MAPPING.get(gpu_type, gpu_type)
     """
     
+    # Scopes this adapter's entries in the shared availability cache;
+    # defaults to the module-qualified class name
+    provider_name: str = ""
+    
+    def _availability_key(self, gpu_type: str) -> Tuple[str, str]:
+        cls = type(self)
+        return (self.provider_name or f"{cls.__module__}.{cls.__qualname__}", gpu_type)
+    
     async def check_gpu_availability(self, gpu_type: str) -> Dict[str, Any]:
         """
         Check GPU availability (standardized implementation)
@@ -128,19 +171,53 @@ class ProviderAdapterTemplate(ProviderAdapter):
             "regions": List[str]
         }
         """
-        try:
-            # Step 1: Map GPU type to provider format
-            mapped_gpu = self._map_gpu_type(gpu_type)
-            
-            # Step 2: Fetch data from provider API
-            raw_data = await self._fetch_availability_data(mapped_gpu)
+        key = self._availability_key(gpu_type)
+        cached = _get_cached_availability(key)
+        if cached is not None:
+            return cached
+        
+        # Only one caller per key hits the provider API; the rest wait for its result
+        async with _availability_locks[key]:
+            cached = _get_cached_availability(key)
+            if cached is not None:
+                return cached
             
-            # Step 3: Parse and return standardized response
-            return self._parse_availability_response(raw_data)
+            try:
+                # Step 1: Map GPU type to provider format
+                mapped_gpu = self._map_gpu_type(gpu_type)
+                
+                # Step 2: Fetch data from provider API
+                raw_data = await self._fetch_availability_data(mapped_gpu)
+                
+                # Step 3: Parse and return standardized response
+                result = self._parse_availability_response(raw_data)
+                
+            except Exception as e:
+                print(f"[{self.__class__.__name__}] Availability check failed: {e}")
+                raise Exception(f"{self.__class__.__name__} availability check failed: {e}")
             
-        except Exception as e:
-            print(f"[{self.__class__.__name__}] Availability check failed: {e}")
-            raise Exception(f"{self.__class__.__name__} availability check failed: {e}")
+            _availability_cache[key] = (result, time.monotonic() + AVAILABILITY_CACHE_TTL_SECONDS)
+            return dict(result)
+    
+    @staticmethod
+    async def gather_availability(
+        adapters: List[ProviderAdapter],
+        gpu_type: str,
+        concurrency: int = 8
+    ) -> List[Any]:
+        """
+        Check availability on several adapters concurrently
+        
+        Returns one entry per adapter, in order: the availability dict, or the
+        exception raised by that adapter.
+        """
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def one(adapter: ProviderAdapter):
+            async with sem:
+                return await adapter.check_gpu_availability(gpu_type)
+        
+        return await asyncio.gather(*(one(a) for a in adapters), return_exceptions=True)
     
     # ===== Methods to implement in subclasses =====
     
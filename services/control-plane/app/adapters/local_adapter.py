@@ -1,15 +1,42 @@
 import asyncio
+import random
+import time
 import uuid
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from app.adapters.base import ProviderAdapter
+from app.core.template_config import get_template_port
+
+
+@lru_cache(maxsize=32)
+def _template_port(template_type: Optional[str]) -> int:
+    """Resolve (and memoize) the exposed port for a template type."""
+    return get_template_port(template_type or "custom-docker")["port"]
+
+
+class _Inst:
+    """Compact record for a tracked mock instance."""
+    __slots__ = ("status", "endpoint", "port")
+    
+    def __init__(self, status: str, endpoint: str, port: int):
+        self.status = status
+        self.endpoint = endpoint
+        self.port = port
+
 
 class LocalAdapter(ProviderAdapter):
     """
     A mock adapter that simulates GPU provisioning locally without actual resources.
     """
     
+    # Cap on tracked mock instances; the oldest entry is evicted beyond this
+    _MAX = 4096
+    
     def __init__(self):
-        self.instances = {}
+        self.instances = OrderedDict()
+        self._endpoint_tpl = "http://localhost:{port}"
+        self._rng = random.Random()
 
     async def create_instance(
         self, 
@@ -23,23 +50,21 @@ class LocalAdapter(ProviderAdapter):
         Create a local mock instance
         Supports template_type for endpoint URL generation
         """
-        from app.core.template_config import get_template_port
-        
-        instance_id = f"local-{uuid.uuid4().hex[:8]}"
+        instance_id = "local-" + uuid.uuid4().bytes[:4].hex()
         
         # Get port from template configuration
-        port_config = get_template_port(template_type or "custom-docker")
-        port = port_config["port"]
+        port = _template_port(template_type)
+        endpoint = self._endpoint_tpl.format(port=port)
         
-        self.instances[instance_id] = {
-            "status": "running",  # Local instances start immediately
-            "endpoint": f"http://localhost:{port}"
-        }
+        if len(self.instances) >= self._MAX:
+            self.instances.popitem(last=False)
+        # Local instances start immediately
+        self.instances[instance_id] = _Inst("running", endpoint, port)
         
         return {
             "instance_id": instance_id,
             "status": "running",
-            "endpoint_url": f"http://localhost:{port}",
+            "endpoint_url": endpoint,
             "exposed_port": port
         }
 
@@ -47,13 +72,23 @@ class LocalAdapter(ProviderAdapter):
         """
         Get status of local mock instance
         """
+        inst = self.instances.get(instance_id)
+        if inst is None:
+            # Unknown (e.g. evicted or pre-restart) instances are reported as running
+            return {
+                "status": "running",
+                "endpoint": self._endpoint_tpl.format(port=exposed_port),
+                "ssh_connection_string": None
+            }
+        
         return {
-            "status": "running",
-            "endpoint": f"http://localhost:{exposed_port}",
+            "status": inst.status,
+            "endpoint": inst.endpoint,
             "ssh_connection_string": None
         }
 
     async def delete_instance(self, instance_id: str) -> bool:
+        self.instances.pop(instance_id, None)
         return True
     
     async def stop_instance(self, instance_id: str) -> bool:
@@ -88,27 +123,26 @@ class LocalAdapter(ProviderAdapter):
         since: Optional[Any] = None
     ) -> list[str]:
         """Get mock logs for local adapter."""
-        from datetime import datetime
+        ts = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        
+        if since:
+            return [f"[{ts}] Processing..."]
         
         mock_logs = [
-            f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Local container started",
-            f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Service ready on localhost",
+            f"[{ts}] Local container started",
+            f"[{ts}] Service ready on localhost",
         ]
         
-        if since:
-            return [f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Processing..."]
-        
         return mock_logs[-lines:]
     
     async def get_metrics(self, instance_id: str) -> Dict[str, Any]:
         """Get mock metrics for local adapter."""
-        import random
-        
+        rng = self._rng
         return {
-            "gpu_utilization": random.uniform(50, 75),
-            "gpu_memory_utilization": random.uniform(45, 70),
-            "cpu_utilization": random.uniform(20, 40),
-            "ram_utilization": random.uniform(30, 60),
-            "network_rx_bytes": random.randint(500000, 5000000),
-            "network_tx_bytes": random.randint(250000, 2500000)
+            "gpu_utilization": rng.uniform(50, 75),
+            "gpu_memory_utilization": rng.uniform(45, 70),
+            "cpu_utilization": rng.uniform(20, 40),
+            "ram_utilization": rng.uniform(30, 60),
+            "network_rx_bytes": rng.randint(500000, 5000000),
+            "network_tx_bytes": rng.randint(250000, 2500000)
         }
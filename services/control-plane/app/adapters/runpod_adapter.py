@@ -1,11 +1,26 @@
+import asyncio
+import hashlib
 import httpx
-import json
-from typing import Dict, Any, Optional
+import logging
+import orjson
+import random
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
 from app.adapters.base import ProviderAdapter
 from app.core.config import settings
+from app.core.redis import shared_fetch
+from app.core.template_config import TEMPLATE_PORTS, get_template_port
 
-# GPU 类型映射表 / GPU Type Mapping
-GPU_TYPE_MAPPING = {
+logger = logging.getLogger(__name__)
+
+# GPU 类型映射表 / GPU Type Mapping (read-only)
+GPU_TYPE_MAPPING = MappingProxyType({
     "RTX4090": "NVIDIA GeForce RTX 4090",
     "RTX 4090": "NVIDIA GeForce RTX 4090",
     "RTX4080": "NVIDIA GeForce RTX 4080",
@@ -17,22 +32,643 @@ GPU_TYPE_MAPPING = {
     "H100": "NVIDIA H100 PCIe",
     "A6000": "NVIDIA RTX A6000",
     "A5000": "NVIDIA RTX A5000",
+})
+
+# 模板启动命令 / Docker start command per template type; others use the image default
+_DOCKER_ARG_TEMPLATES = MappingProxyType({
+    # vLLM 或 FastAPI - 需要启动服务
+    "llm-inference": "bash -c 'python -m vllm.entrypoints.openai.api_server --host 0.0.0.0 --port {port} > /workspace/vllm.log 2>&1 & sleep infinity'",
+    # Jupyter Lab
+    "jupyter": "bash -c 'jupyter lab --ip=0.0.0.0 --port={port} --no-browser --allow-root --NotebookApp.token=\"\" --NotebookApp.password=\"\" > /workspace/jupyter.log 2>&1 & sleep infinity'",
+})
+
+
+@lru_cache(maxsize=64)
+def _build_docker_args(template_type: Optional[str], port: int) -> str:
+    """Render (and memoize) dockerArgs for a template/port pair"""
+    return _DOCKER_ARG_TEMPLATES.get(template_type, "").format(port=port)
+
+
+# 预生成的启动参数 / dockerArgs for every template at its configured port
+_DOCKER_ARGS_CACHE: Dict[Tuple[Optional[str], int], str] = {
+    (template_type, config["port"]): _build_docker_args(template_type, config["port"])
+    for template_type, config in TEMPLATE_PORTS.items()
+}
+
+
+@lru_cache(maxsize=256)
+def _alias_key(name: str) -> str:
+    """Normalize a GPU name, e.g. "NVIDIA GeForce RTX 4090" and "RTX4090" both become rtx4090"""
+    return name.lower().replace(" ", "").replace("nvidia", "").replace("geforce", "")
+
+
+# 别名索引 / Normalized alias -> normalized RunPod id, built once at import
+_GPU_ALIASES: Dict[str, str] = {
+    _alias_key(alias): _alias_key(runpod_id)
+    for alias, runpod_id in GPU_TYPE_MAPPING.items()
+}
+
+
+def _suggested_poll_seconds(status: str, uptime_seconds: int = 0) -> int:
+    """How long a caller should wait before polling this pod's status again"""
+    if status == "creating":
+        return 1
+    if status == "running":
+        # Still warming up vs. stable
+        return 10 if uptime_seconds < 300 else 30
+    return 60
+
+
+# 批量 mutation 的输入类型 / GraphQL input type per supported pod mutation
+_MUTATION_INPUT_TYPES = {
+    "podStop": "PodStopInput!",
+    "podResume": "PodResumeInput!",
+    "podRestart": "PodRestartInput!",
+    "podTerminate": "PodTerminateInput!",
+}
+# podTerminate returns a scalar, so it takes no selection set
+_MUTATION_SELECTIONS = {"podTerminate": ""}
+
+
+def _lite_status(pod: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Map a lite pod selection to the status dict returned by get_status_lite"""
+    if not pod:
+        status = "deleted"
+        uptime_seconds = 0
+    else:
+        desired_status = (pod.get("desiredStatus") or "").upper()
+        runtime = pod.get("runtime")
+        uptime_seconds = (runtime or {}).get("uptimeInSeconds") or 0
+        if desired_status == "RUNNING":
+            # 容器还未启动 -> creating
+            status = "running" if runtime is not None else "creating"
+        elif desired_status == "EXITED":
+            status = "stopped"
+        else:
+            status = "creating"
+    
+    return {
+        "status": status,
+        "uptime_seconds": uptime_seconds,
+        "suggested_poll_seconds": _suggested_poll_seconds(status, uptime_seconds)
+    }
+
+
+@dataclass(slots=True)
+class PodStatusView:
+    """Flattened view of a full pod selection, built in one pass by from_raw"""
+    pod_id: str
+    desired_status: str
+    has_runtime: bool
+    uptime: int
+    gpu_util: int
+    gpu_mem_util: int
+    vcpu: Optional[int]
+    ram: Optional[int]
+    storage: int
+    ports: List[Dict[str, Any]]
+
+    @classmethod
+    def from_raw(cls, pod: Dict[str, Any]) -> "PodStatusView":
+        runtime = pod.get("runtime")
+        has_runtime = runtime is not None
+        runtime = runtime or {}
+        gpus = runtime.get("gpus") or ()
+        first_gpu = gpus[0] if gpus else {}
+        return cls(
+            pod_id=pod.get("id"),
+            desired_status=(pod.get("desiredStatus") or "").upper(),
+            has_runtime=has_runtime,
+            uptime=runtime.get("uptimeInSeconds") or 0,
+            gpu_util=first_gpu.get("gpuUtilPercent") or 0,
+            gpu_mem_util=first_gpu.get("memoryUtilPercent") or 0,
+            vcpu=pod.get("vcpuCount"),
+            ram=pod.get("memoryInGb"),
+            storage=(pod.get("containerDiskInGb") or 0) + (pod.get("volumeInGb") or 0),
+            ports=runtime.get("ports") or [],
+        )
+
+
+# Pod 字段片段 / Shared Pod selections, defined once per document
+_POD_LITE_FRAGMENT = """
+fragment PodLiteFields on Pod {
+  id
+  desiredStatus
+  runtime {
+    uptimeInSeconds
+  }
+}"""
+_POD_STATUS_FRAGMENT = """
+fragment PodStatusFields on Pod {
+  id
+  name
+  desiredStatus
+  vcpuCount
+  memoryInGb
+  containerDiskInGb
+  volumeInGb
+  runtime {
+    uptimeInSeconds
+    ports {
+      ip
+      isIpPublic
+      privatePort
+      publicPort
+      type
+    }
+    gpus {
+      id
+      gpuUtilPercent
+      memoryUtilPercent
+    }
+  }
+  machine {
+    podHostId
+  }
+}"""
+
+
+@lru_cache(maxsize=64)
+def _status_query(count: int) -> bytes:
+    """JSON-encoded lite status query for `count` pods aliased p0, p1, ..."""
+    params = ", ".join(f"$p{i}: String!" for i in range(count))
+    fields = "\n".join(
+        f"  p{i}: pod(input: {{podId: $p{i}}}) {{ ...PodLiteFields }}" for i in range(count)
+    )
+    return orjson.dumps(f"query({params}) {{\n{fields}\n}}" + _POD_LITE_FRAGMENT)
+
+
+@lru_cache(maxsize=32)
+def _availability_query(count: int) -> bytes:
+    """JSON-encoded stock query with `count` aliased gpuTypes fields ($g0..)"""
+    params = ", ".join(f"$g{i}: String!" for i in range(count))
+    fields = "\n".join(
+        f"  g{i}: gpuTypes(input: {{id: $g{i}}}) {{ ...stock }}" for i in range(count)
+    )
+    return orjson.dumps(f"""query({params}) {{
+{fields}
+}}
+fragment stock on GpuType {{
+  id
+  displayName
+  lowestPrice(input: {{gpuCount: 1, secureCloud: true}}) {{
+    stockStatus
+    maxUnreservedGpuCount
+    uninterruptablePrice
+  }}
+}}""")
+
+
+@lru_cache(maxsize=32)
+def _batch_mutation(names: Tuple[str, ...]) -> bytes:
+    """JSON-encoded mutation document running `names` in order as m0, m1, ..."""
+    params = ", ".join(f"$i{i}: {_MUTATION_INPUT_TYPES[name]}" for i, name in enumerate(names))
+    fields = "\n".join(
+        f"  m{i}: {name}(input: $i{i}){_MUTATION_SELECTIONS.get(name, ' { id }')}"
+        for i, name in enumerate(names)
+    )
+    return orjson.dumps(f"mutation({params}) {{\n{fields}\n}}")
+
+
+def _field_unavailable(errors: list, field: str) -> bool:
+    """True if GraphQL errors say the schema has no such field"""
+    return any(
+        field in str(error.get("message", "")) and "Cannot query field" in str(error.get("message", ""))
+        for error in errors
+    )
+
+
+@lru_cache(maxsize=32)
+def _template_port(template_type: Optional[str]) -> int:
+    """Resolve (and memoize) the exposed port for a template type."""
+    return get_template_port(template_type or "custom-docker")["port"]
+
+
+# GraphQL 文档 / Static GraphQL documents: name -> query text
+_QUERY_TEXT = {
+    # 创建实例
+    "create": """
+    mutation($input: PodFindAndDeployOnDemandInput!) {
+      podFindAndDeployOnDemand(input: $input) {
+        id
+        imageName
+        env
+        machineId
+        machine {
+          podHostId
+        }
+      }
+    }
+    """,
+    # 轻量状态查询 (每次轮询)
+    "status_lite": """
+    query($podId: String!) {
+      pod(input: {podId: $podId}) { ...PodLiteFields }
+    }
+    """ + _POD_LITE_FRAGMENT,
+    # 完整状态 (ports / SSH / GPU)
+    "status_full": """
+    query($podId: String!) {
+      pod(input: {podId: $podId}) { ...PodStatusFields }
+    }
+    """ + _POD_STATUS_FRAGMENT,
+    # 删除实例
+    "terminate": """
+    mutation($input: PodTerminateInput!) {
+      podTerminate(input: $input)
+    }
+    """,
+    # 停止实例
+    "stop": """
+    mutation($input: PodStopInput!) {
+      podStop(input: $input) {
+        id
+        desiredStatus
+      }
+    }
+    """,
+    # 启动实例
+    "resume": """
+    mutation($input: PodResumeInput!) {
+      podResume(input: $input) {
+        id
+      }
+    }
+    """,
+    # 重启实例
+    "restart": """
+    mutation($input: PodRestartInput!) {
+      podRestart(input: $input) {
+        id
+        desiredStatus
+      }
+    }
+    """,
+    # 所有 GPU 的按需价格
+    "prices": """
+    {
+      gpuTypes {
+        id
+        displayName
+        lowestPrice(input: {gpuCount: 1}) {
+          uninterruptablePrice
+        }
+      }
+    }
+    """,
+}
+
+
+def _encode_body(
+    query_json: Optional[bytes],
+    variables: Optional[Dict[str, Any]] = None,
+    extensions_json: Optional[bytes] = None
+) -> bytes:
+    """Assemble a GraphQL request body from already-encoded JSON fragments"""
+    parts = []
+    if query_json is not None:
+        parts.append(b'"query":' + query_json)
+    if variables is not None:
+        parts.append(b'"variables":' + orjson.dumps(variables))
+    if extensions_json is not None:
+        parts.append(b'"extensions":' + extensions_json)
+    return b"{" + b",".join(parts) + b"}"
+
+
+# name -> (JSON-encoded query, JSON-encoded persisted-query extension, is mutation)
+# Encoded once at import; only the variables are serialized per request
+_QUERIES = {
+    name: (
+        orjson.dumps(query),
+        orjson.dumps({
+            "persistedQuery": {"version": 1, "sha256Hash": hashlib.sha256(query.encode()).hexdigest()}
+        }),
+        query.lstrip().startswith("mutation")
+    )
+    for name, query in _QUERY_TEXT.items()
 }
 
+
+def _persisted_query_not_found(errors: list) -> bool:
+    """True if the server asked for the full text of a persisted query"""
+    return any(
+        isinstance(error, dict) and (
+            error.get("message") == "PersistedQueryNotFound"
+            or (error.get("extensions") or {}).get("code") == "PERSISTED_QUERY_NOT_FOUND"
+        )
+        for error in errors
+    )
+
+
+def _persisted_query_not_supported(errors: list) -> bool:
+    """True if the server does not accept persisted (hash-only) queries at all"""
+    return any(
+        isinstance(error, dict) and (
+            error.get("message") == "PersistedQueryNotSupported"
+            or (error.get("extensions") or {}).get("code") == "PERSISTED_QUERY_NOT_SUPPORTED"
+        )
+        for error in errors
+    )
+
+
+# 重试策略 / Request retries: attempts and exponential backoff bounds
+RETRY_ATTEMPTS = 4
+RETRY_INITIAL_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+# Upper bound on a server-requested Retry-After wait
+RETRY_AFTER_MAX_SECONDS = 30.0
+
+
+def _is_retryable(error: httpx.HTTPError, idempotent: bool) -> bool:
+    """Whether a failed RunPod request is safe and worthwhile to retry"""
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return code in (429, 503) or (idempotent and code >= 500)
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    return idempotent and isinstance(error, httpx.TransportError)
+
+
+def _retry_after(error: httpx.HTTPError) -> Optional[float]:
+    """Seconds requested by a 429/503 Retry-After header, if any"""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        # HTTP-date form
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX_SECONDS)
+
+
+# DRY_RUN 模拟日志 / Mock log lines, timestamped per call
+_MOCK_LOGS = (
+    "Starting container...",
+    "Loading environment variables",
+    "Initializing GPU...",
+    "GPU detected: NVIDIA RTX 4090",
+    "Loading model weights...",
+    "Model loaded successfully",
+    "Starting web server on port 7860...",
+    "Server ready! Listening on http://0.0.0.0:7860",
+    "Waiting for requests...",
+)
+
+
+# 价格/库存缓存 / Pricing and stock caches: key -> (value, expires_at)
+# Per-process layer in front of the shared Redis cache (app.core.redis)
+PRICING_CACHE_TTL_SECONDS = 60
+AVAILABILITY_CACHE_TTL_SECONDS = 15
+# Price maps are per API key as well: key scope -> (prices, expires_at)
+_pricing_cache: Dict[str, Tuple[Dict[str, float], float]] = {}
+# Availability is per API key (quota/visibility differ): (key scope, gpu_type)
+_availability_cache: Dict[Tuple[str, str], Tuple[Dict[str, Any], float]] = {}
+# Expired prices are still served this long while refreshing in the background
+PRICING_STALE_SECONDS = 300
+# Strong references to in-flight background refreshes
+_background_tasks: set = set()
+# Per-key locks so concurrent misses share one upstream request
+_cache_locks: Dict[Tuple[str, ...], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# 创建请求合并 / Concurrent creates of the same pod spec share one batch
+CREATE_BATCH_WINDOW_SECONDS = 0.02
+_pending_creates: Dict[Tuple[str, str, str, Optional[str]], list] = {}
+# Deploys running per pod spec; a create with none running or pending skips the window
+_creates_in_flight: Dict[Tuple[str, str, str, Optional[str]], int] = defaultdict(int)
+
+# 状态轮询批处理 / Concurrent status polls (per API key) share one aliased request
+STATUS_BATCH_DELAY_SECONDS = 0.02
+STATUS_BATCH_MAX_SIZE = 50
+_status_batches: Dict[str, Dict[str, asyncio.Future]] = {}
+# Connection details (endpoint, SSH) of running pods from their last full
+# query: (pod id, exposed_port) -> (fields, expires_at). Steady-state polls
+# send only the lite query; the full query (with GPU utilization and
+# resources) runs again once the entry expires.
+RUNNING_STATUS_FULL_REFRESH_SECONDS = 120
+RUNNING_STATUS_CACHE_MAX_SIZE = 1000
+_STATIC_STATUS_FIELDS = ("endpoint", "ssh_connection_string")
+_running_status_cache: "OrderedDict[Tuple[str, int], Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+# 库存查询批处理 / Availability lookups (per API key) are coalesced into one GraphQL request
+AVAILABILITY_BATCH_DELAY_SECONDS = 0.005
+AVAILABILITY_BATCH_MAX_SIZE = 20
+_availability_batches: Dict[str, Dict[str, asyncio.Future]] = {}
+
+
+def _finish_creates(key: Tuple[str, str, str, Optional[str]], count: int):
+    _creates_in_flight[key] -= count
+    if _creates_in_flight[key] <= 0:
+        del _creates_in_flight[key]
+
+
+def _key_scope(api_key: Optional[str]) -> str:
+    """Short digest of an API key, for cache keys that must not hold the key itself"""
+    return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+
+def _get_cached(cache: Dict[Any, Tuple[Any, float]], key: Any) -> Optional[Any]:
+    """Return the cached value for key if it has not expired"""
+    entry = cache.get(key)
+    if entry and time.monotonic() < entry[1]:
+        return entry[0]
+    return None
+
 class RunPodAdapter(ProviderAdapter):
     """
     RunPod GPU 云服务适配器
     文档: https://docs.runpod.io/reference/graphql-api
     """
     
-    def __init__(self, api_key: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+    # 所有实例共享一个连接池 / Connection pool shared by every adapter instance
+    _client: Optional[httpx.AsyncClient] = None
+    # DRY_RUN mock data source
+    _rng = random.Random()
+    # Cleared if RunPod rejects hash-only (persisted) queries
+    _apq_enabled = True
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.api_key = api_key or settings.RUNPOD_API_KEY
         # RunPod API key is passed as URL parameter, not header
         self.api_url = f"https://api.runpod.io/graphql?api_key={self.api_key}"
+        self._params = {"api_key": self.api_key}
+        # Per-key results (stock, prices) are cached under this digest
+        self._scope = _key_scope(self.api_key)
         self.headers = {
             "Content-Type": "application/json",
         }
         self.config = config or {}
+        # Injected client (e.g. for tests); defaults to the shared pool
+        self._http = client
+    
+    @classmethod
+    def open(cls) -> httpx.AsyncClient:
+        """Build the shared client up front (called on application startup)"""
+        return cls._get_client()
+    
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        """Return the shared AsyncClient, creating it on first use"""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                base_url="https://api.runpod.io",
+                headers={"Accept-Encoding": "gzip, deflate"},
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                # No transport-level retries: _post owns retry and backoff
+                transport=httpx.AsyncHTTPTransport(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=100,
+                        max_keepalive_connections=50,
+                        keepalive_expiry=60
+                    )
+                )
+            )
+        return cls._client
+    
+    async def _execute(
+        self,
+        name: str,
+        variables: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a registered GraphQL document (see _QUERIES).
+        
+        With automatic persisted queries only the query hash is sent; on
+        PersistedQueryNotFound the full text is sent once so the server can
+        cache it. Only an explicit PersistedQueryNotSupported switches APQ
+        off for this process; any other failure (auth, rate limit, query
+        errors) is returned or raised unchanged.
+        """
+        query_json, extensions_json, is_mutation = _QUERIES[name]
+        idempotent = not is_mutation
+        
+        if not RunPodAdapter._apq_enabled:
+            return await self._post(_encode_body(query_json, variables), timeout, idempotent)
+        
+        try:
+            data = await self._post(
+                _encode_body(None, variables, extensions_json), timeout, idempotent
+            )
+        except httpx.HTTPStatusError as e:
+            # Some servers answer a hash-only request with a 400
+            if e.response.status_code != 400:
+                raise
+            try:
+                body = orjson.loads(e.response.content)
+            except orjson.JSONDecodeError:
+                body = None
+            errors = body.get("errors") if isinstance(body, dict) else None
+            if not isinstance(errors, list) or not (
+                _persisted_query_not_found(errors) or _persisted_query_not_supported(errors)
+            ):
+                raise
+            data = {"errors": errors}
+        # Request-level errors omit "data"; anything else means it executed
+        if "data" in data or not data.get("errors"):
+            return data
+        
+        if _persisted_query_not_found(data["errors"]):
+            return await self._post(
+                _encode_body(query_json, variables, extensions_json), timeout, idempotent
+            )
+        if _persisted_query_not_supported(data["errors"]):
+            logger.info("RunPod does not support persisted queries, sending full text")
+            RunPodAdapter._apq_enabled = False
+            return await self._post(_encode_body(query_json, variables), timeout, idempotent)
+        return data
+    
+    async def _graphql(
+        self,
+        name: str,
+        variables: Optional[Dict[str, Any]] = None,
+        action: str = "call RunPod API"
+    ) -> Dict[str, Any]:
+        """
+        Run a registered document and return its "data" object.
+        
+        Raises on GraphQL errors; HTTP failures are re-raised as
+        "Failed to {action}: ..." (the response body is only decoded here).
+        """
+        if not self.api_key:
+            raise ValueError("RUNPOD_API_KEY not configured")
+        
+        try:
+            data = await self._execute(name, variables)
+        except httpx.HTTPError as e:
+            # 响应体只在失败时解码; no traceback - it would print the api_key URL
+            logger.error(
+                "RunPod %s failed: %s",
+                name,
+                e.response.text if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+            )
+            raise Exception(f"Failed to {action}: {str(e)}")
+        
+        if "errors" in data:
+            raise Exception(f"RunPod API Error: {data['errors']}")
+        return data["data"]
+    
+    async def _post(
+        self,
+        content: bytes,
+        timeout: Optional[float] = None,
+        idempotent: bool = True
+    ) -> Dict[str, Any]:
+        """
+        POST an encoded GraphQL request body and return the decoded response.
+        
+        Transient failures are retried with jittered exponential backoff.
+        Mutations (idempotent=False) are only retried when the request cannot
+        have reached RunPod (connect errors, 429/503), so a pod is never
+        created twice. A Retry-After header lengthens the wait.
+        """
+        extra = {} if timeout is None else {"timeout": timeout}
+        client = self._http or self._get_client()
+        
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            try:
+                response = await client.post(
+                    "/graphql",
+                    params=self._params,
+                    headers=self.headers,
+                    content=content,
+                    **extra
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("RunPod response %s: %s", response.status_code, response.text)
+                response.raise_for_status()
+                return orjson.loads(response.content)
+            except httpx.HTTPError as e:
+                if attempt == RETRY_ATTEMPTS or not _is_retryable(e, idempotent):
+                    raise
+                delay = min(RETRY_MAX_SECONDS, RETRY_INITIAL_SECONDS * 2 ** (attempt - 1))
+                delay += random.uniform(0, delay)
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                # Log the error type only: the request URL carries the API key
+                logger.warning(
+                    "RunPod request failed (%s), retry %d in %.2fs", type(e).__name__, attempt, delay
+                )
+                await asyncio.sleep(delay)
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared client (called on application shutdown)"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
     
     async def create_instance(
         self, 
@@ -49,18 +685,14 @@ class RunPodAdapter(ProviderAdapter):
         # DRY_RUN 模式 - 不调用真实 API
         if settings.DRY_RUN:
             from uuid import uuid4
-            from app.core.template_config import get_template_port
             
             mock_id = f"dry-run-{uuid4().hex[:8]}"
-            port_config = get_template_port(template_type or "custom-docker")
-            port = port_config["port"]
+            port = _template_port(template_type)
             
-            print(f"[DRY_RUN] Mock creating RunPod instance:")
-            print(f"  - ID: {mock_id}")
-            print(f"  - GPU: {gpu_type}")
-            print(f"  - Image: {image}")
-            print(f"  - Template: {template_type}")
-            print(f"  - Port: {port}")
+            logger.debug(
+                "[DRY_RUN] Mock creating RunPod instance: id=%s gpu=%s image=%s template=%s port=%s",
+                mock_id, gpu_type, image, template_type, port
+            )
             
             return {
                 "instance_id": mock_id,
@@ -73,28 +705,128 @@ class RunPodAdapter(ProviderAdapter):
         if not self.api_key:
             raise ValueError("RUNPOD_API_KEY not configured")
         
+        key = (self.api_key, gpu_type, image, template_type)
+        waiters = _pending_creates.get(key)
+        if waiters is None and not _creates_in_flight.get(key):
+            # Nothing to batch with: deploy without waiting out the window
+            _creates_in_flight[key] += 1
+            try:
+                return await self._deploy_pod(deployment_id, gpu_type, image, template_type, env)
+            finally:
+                _finish_creates(key, 1)
+        
+        # Join (or start) a batch of concurrent creates for the same pod spec
+        future = asyncio.get_running_loop().create_future()
+        if waiters is None:
+            waiters = _pending_creates[key] = []
+            task = asyncio.create_task(self._run_create_batch(key))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        waiters.append((future, deployment_id, env))
+        return await future
+    
+    async def _run_create_batch(self, key: Tuple[str, str, str, Optional[str]]):
+        """
+        Launch every create queued under key within CREATE_BATCH_WINDOW_SECONDS.
+        Batches of more than one share a single availability check, then the
+        pods are deployed concurrently.
+        """
+        await asyncio.sleep(CREATE_BATCH_WINDOW_SECONDS)
+        waiters = _pending_creates.pop(key)
+        _creates_in_flight[key] += len(waiters)
+        try:
+            await self._launch_create_batch(key, waiters)
+        finally:
+            _finish_creates(key, len(waiters))
+    
+    async def _launch_create_batch(self, key: Tuple[str, str, str, Optional[str]], waiters: list):
+        _, gpu_type, image, template_type = key
+        
+        if len(waiters) > 1:
+            try:
+                availability = await self.check_gpu_availability(gpu_type)
+            except Exception as e:
+                # Let the individual deploys report the real error
+                logger.warning("Pre-create availability check failed: %s", e)
+                availability = None
+            
+            if availability is not None and not availability["available"]:
+                error = Exception(f"RunPod has no {gpu_type} capacity available")
+                for future, _, _ in waiters:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+        
+        results = await asyncio.gather(
+            *(
+                self._deploy_pod(deployment_id, gpu_type, image, template_type, env)
+                for _, deployment_id, env in waiters
+            ),
+            return_exceptions=True
+        )
+        for (future, _, _), result in zip(waiters, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    async def _deploy_pod(
+        self,
+        deployment_id: str,
+        gpu_type: str,
+        image: str,
+        template_type: Optional[str],
+        env: Optional[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Run the podFindAndDeployOnDemand mutation for one deployment"""
+        variables, port = await self._prepare_variables(
+            deployment_id, gpu_type, image, template_type, env
+        )
+        return await self._submit_deploy(variables, port)
+    
+    async def create_if_available(
+        self,
+        deployment_id: str,
+        gpu_type: str,
+        image: str,
+        template_type: str = None,
+        env: Dict[str, str] = None
+    ) -> Dict[str, Any]:
+        """
+        Check-then-create: the availability check and request preparation
+        run concurrently, then the pod is deployed if RunPod has capacity.
+        """
+        if settings.DRY_RUN:
+            return await self.create_instance(deployment_id, gpu_type, image, template_type, env)
+        
+        if not self.api_key:
+            raise ValueError("RUNPOD_API_KEY not configured")
+        
+        availability, (variables, port) = await asyncio.gather(
+            self.check_gpu_availability(gpu_type),
+            self._prepare_variables(deployment_id, gpu_type, image, template_type, env)
+        )
+        if not availability["available"]:
+            raise Exception(f"RunPod has no {gpu_type} capacity available")
+        
+        return await self._submit_deploy(variables, port)
+    
+    async def _prepare_variables(
+        self,
+        deployment_id: str,
+        gpu_type: str,
+        image: str,
+        template_type: Optional[str],
+        env: Optional[Dict[str, str]]
+    ) -> Tuple[Dict[str, Any], int]:
+        """Build the podFindAndDeployOnDemand input; returns (variables, port)"""
         # 映射 GPU 类型
         runpod_gpu_type = GPU_TYPE_MAPPING.get(gpu_type, gpu_type)
         
         # 获取模板端口配置
-        from app.core.template_config import get_template_port
-        port_config = get_template_port(template_type or "custom-docker")
-        port = port_config["port"]
-        
-        # 构建 GraphQL mutation
-        mutation = """
-        mutation($input: PodFindAndDeployOnDemandInput!) {
-          podFindAndDeployOnDemand(input: $input) {
-            id
-            imageName
-            env
-            machineId
-            machine {
-              podHostId
-            }
-          }
-        }
-        """
+        port = _template_port(template_type)
         
         # 根据模板类型设置不同的启动命令
         docker_args = self._get_docker_args(template_type, port)
@@ -114,65 +846,135 @@ class RunPodAdapter(ProviderAdapter):
                 "dockerArgs": docker_args,
                 "ports": f"{port}/http,22/tcp",
                 "volumeMountPath": "/workspace",
-                "env": [{"key": k, "value": v} for k, v in (env or {}).items()]
+                "env": [{"key": k, "value": v} for k, v in env.items()] if env else []
             }
         }
+        return variables, port
+    
+    async def _submit_deploy(self, variables: Dict[str, Any], port: int) -> Dict[str, Any]:
+        """POST a prepared podFindAndDeployOnDemand mutation"""
+        data = await self._graphql("create", variables, "create RunPod instance")
         
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": mutation, "variables": variables}
-                )
-                
-                print(f"Response status: {response.status_code}")
-                print(f"Response body: {response.text}")
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                if "errors" in data:
-                    raise Exception(f"RunPod API Error: {data['errors']}")
-                
-                pod_data = data["data"]["podFindAndDeployOnDemand"]
-                
-                return {
-                    "instance_id": pod_data["id"],
-                    "status": "creating",
-                    "exposed_port": port
-                }
-        except httpx.HTTPError as e:
-            raise Exception(f"Failed to create RunPod instance: {str(e)}")
+        return {
+            "instance_id": data["podFindAndDeployOnDemand"]["id"],
+            "status": "creating",
+            "exposed_port": port
+        }
     
     def _get_docker_args(self, template_type: str, port: int) -> str:
         """
         根据模板类型生成 Docker 启动参数
         """
-        if template_type == "image-generation":
-            # Stable Diffusion WebUI - 通常镜像自带启动脚本
-            return ""
-        elif template_type == "llm-inference":
-            # vLLM 或 FastAPI - 需要启动服务
-            return f"bash -c 'python -m vllm.entrypoints.openai.api_server --host 0.0.0.0 --port {port} > /workspace/vllm.log 2>&1 & sleep infinity'"
-        elif template_type == "comfyui":
-            # ComfyUI - 通常镜像自带启动脚本
-            return ""
-        elif template_type == "jupyter":
-            # Jupyter Lab
-            return f"bash -c 'jupyter lab --ip=0.0.0.0 --port={port} --no-browser --allow-root --NotebookApp.token=\"\" --NotebookApp.password=\"\" > /workspace/jupyter.log 2>&1 & sleep infinity'"
-        else:
-            # Custom Docker - 让镜像自己处理
-            return ""
+        # image-generation / comfyui / custom-docker: 镜像自带启动脚本
+        args = _DOCKER_ARGS_CACHE.get((template_type, port))
+        if args is None:
+            args = _build_docker_args(template_type, port)
+        return args
     
     async def get_status(self, instance_id: str, exposed_port: int = 8888) -> Dict[str, Any]:
         """
         查询 RunPod 实例状态
+        Polls with the lite query. The full query (ports, SSH, resources, GPU
+        stats) is issued when the pod becomes running, while its endpoint/SSH
+        data is still missing, and every RUNNING_STATUS_FULL_REFRESH_SECONDS
+        after that. In between, the lite status is returned with the cached
+        endpoint/SSH fields only, so callers keep their last utilization
+        values instead of receiving stale ones.
+        """
+        if settings.DRY_RUN:
+            return await self.get_status_full(instance_id, exposed_port)
+        
+        key = (instance_id, exposed_port)
+        lite = await self.get_status_lite(instance_id)
+        if lite["status"] != "running":
+            _running_status_cache.pop(key, None)
+            return lite
+        
+        cached = _get_cached(_running_status_cache, key)
+        if cached is not None:
+            return {**cached, **lite}
+        
+        full = await self.get_status_full(instance_id, exposed_port)
+        _running_status_cache.pop(key, None)
+        if full["status"] == "running" and full.get("endpoint") and full.get("ssh_connection_string"):
+            if len(_running_status_cache) >= RUNNING_STATUS_CACHE_MAX_SIZE:
+                # Oldest first: pods that vanished without a delete age out
+                _running_status_cache.popitem(last=False)
+            _running_status_cache[key] = (
+                {field: full[field] for field in _STATIC_STATUS_FIELDS},
+                time.monotonic() + RUNNING_STATUS_FULL_REFRESH_SECONDS
+            )
+        return full
+    
+    async def get_status_lite(self, instance_id: str) -> Dict[str, Any]:
+        """
+        Fetch only desiredStatus and uptime - cheap enough for every poll.
+        Polls arriving within STATUS_BATCH_DELAY_SECONDS (per API key) share
+        one aliased request, and duplicate pod ids share one result.
+        """
+        if not self.api_key:
+            raise ValueError("RUNPOD_API_KEY not configured")
+        
+        batch = _status_batches.get(self.api_key)
+        if batch is None:
+            batch = _status_batches[self.api_key] = {}
+            task = asyncio.create_task(self._run_status_batch(batch))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        
+        future = batch.get(instance_id)
+        if future is None:
+            future = batch[instance_id] = asyncio.get_running_loop().create_future()
+            if len(batch) >= STATUS_BATCH_MAX_SIZE:
+                # Full - later polls start a new batch
+                _status_batches.pop(self.api_key, None)
+        return dict(await future)
+    
+    async def _run_status_batch(self, batch: Dict[str, asyncio.Future]):
+        """Wait for the batch window to close, then resolve every queued poll"""
+        await asyncio.sleep(STATUS_BATCH_DELAY_SECONDS)
+        if _status_batches.get(self.api_key) is batch:
+            del _status_batches[self.api_key]
+        
+        pod_ids = list(batch)
+        try:
+            if len(pod_ids) == 1:
+                data = await self._execute("status_lite", {"podId": pod_ids[0]})
+                aliases = {"pod": pod_ids[0]}
+            else:
+                aliases = {f"p{i}": pod_id for i, pod_id in enumerate(pod_ids)}
+                data = await self._post(_encode_body(_status_query(len(pod_ids)), aliases))
+        except httpx.HTTPError as e:
+            error = Exception(f"Failed to get RunPod status: {str(e)}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        
+        # Errors carry the alias of the pod they belong to in "path"
+        errors: Dict[Optional[str], list] = defaultdict(list)
+        for error in data.get("errors") or []:
+            errors[(error.get("path") or [None])[0]].append(error)
+        results = data.get("data") or {}
+        
+        for alias, pod_id in aliases.items():
+            future = batch[pod_id]
+            if future.done():
+                continue
+            pod_errors = errors.get(alias) or errors.get(None)
+            if pod_errors or alias not in results:
+                future.set_exception(Exception(f"RunPod API Error: {pod_errors or data.get('errors')}"))
+            else:
+                future.set_result(_lite_status(results[alias]))
+    
+    async def get_status_full(self, instance_id: str, exposed_port: int = 8888) -> Dict[str, Any]:
+        """
+        查询 RunPod 实例完整状态 (ports, SSH, resources, GPU utilization)
         支持 DRY_RUN 模式
         """
         # DRY_RUN 模式
         if settings.DRY_RUN:
-            print(f"[DRY_RUN] Mock getting status for instance: {instance_id}")
+            logger.debug("[DRY_RUN] Mock getting status for instance: %s", instance_id)
             return {
                 "status": "running",
                 "endpoint": f"http://localhost:{exposed_port}",
@@ -182,372 +984,244 @@ class RunPodAdapter(ProviderAdapter):
                 "ram_gb": 16,
                 "storage_gb": 40,
                 "gpu_utilization": 0,
-                "gpu_memory_utilization": 0
+                "gpu_memory_utilization": 0,
+                "suggested_poll_seconds": _suggested_poll_seconds("running")
             }
         
         # 真实 API 调用
-        if not self.api_key:
-            raise ValueError("RUNPOD_API_KEY not configured")
+        data = await self._graphql("status_full", {"podId": instance_id}, "get RunPod status")
+        pod = data["pod"]
         
-        query = f"""
-        query {{
-          pod(input: {{podId: "{instance_id}"}}) {{
-            id
-            name
-            desiredStatus
-            vcpuCount
-            memoryInGb
-            containerDiskInGb
-            volumeInGb
-            runtime {{
-              uptimeInSeconds
-              ports {{
-                ip
-                isIpPublic
-                privatePort
-                publicPort
-                type
-              }}
-              gpus {{
-                id
-                gpuUtilPercent
-                memoryUtilPercent
-              }}
-            }}
-            machine {{
-              podHostId
-            }}
-          }}
-        }}
-        """
-        
-        variables = {}
+        if not pod:
+            return {
+                "status": "deleted",
+                "endpoint": None,
+                "ssh_connection_string": None,
+                "suggested_poll_seconds": _suggested_poll_seconds("deleted")
+            }
+
+        view = PodStatusView.from_raw(pod)
         
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": query, "variables": variables}
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "errors" in data:
-                    raise Exception(f"RunPod API Error: {data['errors']}")
-                
-                pod = data["data"]["pod"]
-                
-                print(f"[DEBUG] Full pod data: {pod}")
+        if view.desired_status == "RUNNING":
+            if not view.has_runtime:
+                # 容器还未启动
+                status = "creating"
+                endpoint = None
+                ssh_connection_string = None
+            else:
+                # 容器已启动
+                status = "running"
                 
-                if not pod:
-                    return {
-                        "status": "deleted",
-                        "endpoint": None,
-                        "ssh_connection_string": None
-                    }
-
-                # 判断状态
-                desired_status = pod.get("desiredStatus", "").upper()
+                # 使用传入的 exposed_port 生成 endpoint URL
+                endpoint = f"https://{view.pod_id}-{exposed_port}.proxy.runpod.net"
                 
-                # 提取运行时信息
-                uptime_seconds = 0
-                gpu_utilization = 0
-                gpu_memory_utilization = 0
-                
-                if pod.get("runtime"):
-                    uptime_seconds = pod["runtime"].get("uptimeInSeconds", 0)
-                    gpus = pod["runtime"].get("gpus") or []
-                    if gpus:
-                        gpu_utilization = gpus[0].get("gpuUtilPercent", 0)
-                        gpu_memory_utilization = gpus[0].get("memoryUtilPercent", 0)
-                
-                # 提取配置信息
-                vcpu_count = pod.get("vcpuCount")
-                ram_gb = pod.get("memoryInGb")
-                storage_gb = (pod.get("containerDiskInGb") or 0) + (pod.get("volumeInGb") or 0)
+                # 提取 SSH 信息
+                ssh_port_info = next(
+                    (p for p in view.ports if p.get("privatePort") == 22 and p.get("isIpPublic")),
+                    None
+                )
                 
-                if desired_status == "RUNNING":
-                    if pod["runtime"] is None:
-                        # 容器还未启动
-                        status = "creating"
-                        endpoint = None
-                        ssh_connection_string = None
-                    else:
-                        # 容器已启动
-                        status = "running"
-                        
-                        # 使用传入的 exposed_port 生成 endpoint URL
-                        endpoint = f"https://{pod['id']}-{exposed_port}.proxy.runpod.net"
-                        
-                        # 提取 SSH 信息
-                        ports = pod["runtime"].get("ports") or []
-                        print(f"[DEBUG] Ports for pod {pod['id']}: {ports}")
-                        
-                        ssh_port_info = next(
-                            (p for p in ports if p.get("privatePort") == 22 and p.get("isIpPublic")),
-                            None
-                        )
-                        
-                        if ssh_port_info:
-                            ssh_connection_string = f"ssh root@{ssh_port_info['ip']} -p {ssh_port_info['publicPort']}"
-                            print(f"[DEBUG] SSH connection string: {ssh_connection_string}")
-                        else:
-                            print(f"[DEBUG] No suitable SSH port found in ports: {ports}")
-                            ssh_connection_string = None
-                            
-                elif desired_status == "EXITED":
-                    status = "stopped"
-                    endpoint = None
-                    ssh_connection_string = None
+                if ssh_port_info:
+                    ssh_connection_string = f"ssh root@{ssh_port_info['ip']} -p {ssh_port_info['publicPort']}"
+                    logger.debug("SSH connection string: %s", ssh_connection_string)
                 else:
-                    status = "creating"
-                    endpoint = None
+                    logger.debug("No suitable SSH port found in ports: %s", view.ports)
                     ssh_connection_string = None
-                
-                return {
-                    "status": status,
-                    "endpoint": endpoint,
-                    "ssh_connection_string": ssh_connection_string,
-                    "uptime_seconds": uptime_seconds,
-                    "vcpu_count": vcpu_count,
-                    "ram_gb": ram_gb,
-                    "storage_gb": storage_gb,
-                    "gpu_utilization": gpu_utilization,
-                    "gpu_memory_utilization": gpu_memory_utilization
-                }
-        except httpx.HTTPError as e:
-            raise Exception(f"Failed to get RunPod status: {str(e)}")
+                    
+        elif view.desired_status == "EXITED":
+            status = "stopped"
+            endpoint = None
+            ssh_connection_string = None
+        else:
+            status = "creating"
+            endpoint = None
+            ssh_connection_string = None
+        
+        return {
+            "status": status,
+            "endpoint": endpoint,
+            "ssh_connection_string": ssh_connection_string,
+            "uptime_seconds": view.uptime,
+            "vcpu_count": view.vcpu,
+            "ram_gb": view.ram,
+            "storage_gb": view.storage,
+            "gpu_utilization": view.gpu_util,
+            "gpu_memory_utilization": view.gpu_mem_util,
+            "suggested_poll_seconds": _suggested_poll_seconds(status, view.uptime)
+        }
     
     async def delete_instance(self, instance_id: str) -> bool:
         """
         删除 RunPod 实例
         """
-        if not self.api_key:
-            raise ValueError("RUNPOD_API_KEY not configured")
-        
-        mutation = """
-        mutation($input: PodTerminateInput!) {
-          podTerminate(input: $input)
-        }
-        """
-        
-        variables = {
-            "input": {
-                "podId": instance_id
-            }
-        }
-        
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": mutation, "variables": variables}
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "errors" in data:
-                    raise Exception(f"RunPod API Error: {data['errors']}")
-                
-                return True
-        except httpx.HTTPError as e:
-            raise Exception(f"Failed to delete RunPod instance: {str(e)}")
+        await self._graphql("terminate", {"input": {"podId": instance_id}}, "delete RunPod instance")
+        for key in [key for key in _running_status_cache if key[0] == instance_id]:
+            del _running_status_cache[key]
+        return True
     
     async def stop_instance(self, instance_id: str) -> bool:
         """
         停止 RunPod 实例（保留数据，停止计费）
         """
-        if not self.api_key:
-            raise ValueError("RUNPOD_API_KEY not configured")
-        
-        mutation = """
-        mutation($input: PodStopInput!) {
-          podStop(input: $input) {
-            id
-            desiredStatus
-          }
-        }
-        """
-        
-        variables = {
-            "input": {
-                "podId": instance_id
-            }
-        }
-        
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": mutation, "variables": variables}
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "errors" in data:
-                    raise Exception(f"RunPod API Error: {data['errors']}")
-                
-                print(f"[DEBUG] Stop instance result: {data}")
-                return True
-        except httpx.HTTPError as e:
-            raise Exception(f"Failed to stop RunPod instance: {str(e)}")
+        data = await self._graphql("stop", {"input": {"podId": instance_id}}, "stop RunPod instance")
+        logger.debug("Stop instance result: %s", data)
+        return True
     
     async def start_instance(self, instance_id: str) -> bool:
         """
         启动已停止的 RunPod 实例
         """
+        data = await self._graphql("resume", {"input": {"podId": instance_id, "gpuCount": 1}}, "start RunPod instance")
+        logger.debug("Start instance result: %s", data)
+        return True
+    
+    async def restart_instance(self, instance_id: str) -> bool:
+        """
+        重启运行中的 RunPod 实例
+        """
         if not self.api_key:
             raise ValueError("RUNPOD_API_KEY not configured")
         
-        mutation = """
-        mutation($input: PodResumeInput!) {
-          podResume(input: $input) {
-            id
-          }
-        }
-        """
-        
         variables = {
             "input": {
-                "podId": instance_id,
-                "gpuCount": 1
+                "podId": instance_id
             }
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": mutation, "variables": variables}
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "errors" in data:
+            data = await self._execute("restart", variables)
+            
+            if "errors" in data:
+                if not _field_unavailable(data["errors"], "podRestart"):
                     raise Exception(f"RunPod API Error: {data['errors']}")
-                
-                print(f"[DEBUG] Start instance result: {data}")
-                return True
+                # No server-side restart: stop and resume in one request
+                await self.batch_mutations([
+                    ("podStop", {"podId": instance_id}),
+                    ("podResume", {"podId": instance_id, "gpuCount": 1})
+                ])
+            
+            logger.debug("Restart instance result: %s", data)
+            return True
         except httpx.HTTPError as e:
-            raise Exception(f"Failed to start RunPod instance: {str(e)}")
+            raise Exception(f"Failed to restart RunPod instance: {str(e)}")
     
-    async def restart_instance(self, instance_id: str) -> bool:
+    async def batch_mutations(self, ops: list[Tuple[str, Dict[str, Any]]]) -> list[Any]:
         """
-        重启运行中的 RunPod 实例
+        Run several pod mutations in one GraphQL request.
+        
+        ops: [(mutation name, input), ...], e.g. [("podStop", {"podId": "abc"})].
+        Mutations execute in order; returns each aliased result in the same order.
         """
         if not self.api_key:
             raise ValueError("RUNPOD_API_KEY not configured")
+        if not ops:
+            return []
         
-        mutation = """
-        mutation($input: PodRestartInput!) {
-          podRestart(input: $input) {
-            id
-            desiredStatus
-          }
-        }
-        """
-        
-        variables = {
-            "input": {
-                "podId": instance_id
-            }
-        }
+        mutation = _batch_mutation(tuple(name for name, _ in ops))
+        variables = {f"i{i}": op_input for i, (_, op_input) in enumerate(ops)}
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": mutation, "variables": variables}
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "errors" in data:
-                    raise Exception(f"RunPod API Error: {data['errors']}")
-                
-                print(f"[DEBUG] Restart instance result: {data}")
-                return True
+            data = await self._post(_encode_body(mutation, variables), idempotent=False)
+            
+            if "errors" in data:
+                raise Exception(f"RunPod API Error: {data['errors']}")
+            
+            results = data.get("data") or {}
+            return [results.get(f"m{i}") for i in range(len(ops))]
         except httpx.HTTPError as e:
-            raise Exception(f"Failed to restart RunPod instance: {str(e)}")
+            raise Exception(f"Failed to run RunPod batch mutation: {str(e)}")
+    
+    async def delete_instances(self, instance_ids: list[str]) -> bool:
+        """Terminate several RunPod instances with a single request"""
+        await self.batch_mutations([
+            ("podTerminate", {"podId": instance_id}) for instance_id in instance_ids
+        ])
+        return True
+    
+    @staticmethod
+    def invalidate_pricing():
+        """Drop all cached pricing and availability results"""
+        _pricing_cache.clear()
+        _availability_cache.clear()
     
     async def get_pricing(self, gpu_type: str) -> Optional[float]:
         """
         Get current price per hour for the given GPU type from RunPod.
+        Served from the batched price map (see _fetch_all_prices).
         """
         if not self.api_key:
             return None
         
-        # Map GPU type - handle both "RTX4090" and "RTX 4090" formats
-        runpod_gpu_type = GPU_TYPE_MAPPING.get(gpu_type, gpu_type)
-        
-        # GraphQL query
-        query = """
-        {
-          gpuTypes {
-            id
-            displayName
-            lowestPrice(input: {gpuCount: 1}) {
-              minimumBidPrice
-              uninterruptablePrice
-            }
-          }
-        }
+        prices = await self._fetch_all_prices()
+        key = _alias_key(gpu_type)
+        price = prices.get(_GPU_ALIASES.get(key, key)) or prices.get(key)
+        if price is None:
+            logger.debug("No matching GPU type found for: %s", gpu_type)
+        return price
+    
+    async def _fetch_all_prices(self) -> Dict[str, float]:
+        """
+        Return {alias_key(displayName): price, alias_key(id): price} for every
+        RunPod GPU type.
+        One gpuTypes query per API key serves all its lookups for
+        PRICING_CACHE_TTL_SECONDS.
+        After that the stale map is still served for up to
+        PRICING_STALE_SECONDS while a single background task refreshes it.
         """
+        entry = _pricing_cache.get(self._scope)
+        if entry:
+            now = time.monotonic()
+            if now < entry[1]:
+                return entry[0]
+            if now < entry[1] + PRICING_STALE_SECONDS:
+                if not _cache_locks[("pricing", self._scope)].locked():
+                    task = asyncio.create_task(self._refresh_prices())
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+                return entry[0]
         
+        return await self._refresh_prices()
+    
+    async def _refresh_prices(self) -> Dict[str, float]:
+        """Re-fetch the price map unless another caller just did"""
+        async with _cache_locks[("pricing", self._scope)]:
+            # Another caller may have filled the cache while we waited
+            prices = _get_cached(_pricing_cache, self._scope)
+            if prices is not None:
+                return prices
+            
+            prices = await shared_fetch(
+                f"runpod:prices:{self._scope}", PRICING_CACHE_TTL_SECONDS, self._query_all_prices
+            )
+            if prices:
+                _pricing_cache[self._scope] = (prices, time.monotonic() + PRICING_CACHE_TTL_SECONDS)
+            return prices
+    
+    async def _query_all_prices(self) -> Dict[str, float]:
+        """Fetch on-demand prices for all GPU types (uncached)"""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": query}
-                )
-                
-                if not response.is_success:
-                    print(f"[RunPodAdapter] API call failed with status {response.status_code}")
-                    return None
-                
-                data = response.json()
-                
-                if "errors" in data or "data" not in data:
-                    print(f"[RunPodAdapter] API returned errors: {data.get('errors')}")
-                    return None
-                
-                # Find the matching GPU type
-                gpu_types = data["data"].get("gpuTypes", [])
-                for gpu in gpu_types:
-                    # Match by displayName (more reliable) or id
-                    # displayName examples: "RTX 4090", "RTX 3090"
-                    # id examples: "NVIDIA GeForce RTX 4090"
-                    display_name = gpu.get("displayName", "")
-                    gpu_id = gpu.get("id", "")
-                    
-                    # Try multiple matching strategies
-                    if (display_name == gpu_type or  # Exact match on displayName
-                        gpu_id == runpod_gpu_type or  # Exact match on mapped id
-                        display_name == runpod_gpu_type or  # displayName matches mapped value
-                        gpu_type in display_name or  # Partial match
-                        gpu_type in gpu_id):  # Partial match on id
-                        
-                        lowest_price = gpu.get("lowestPrice", {})
-                        # Use uninterruptable (on-demand) price
-                        price = lowest_price.get("uninterruptablePrice")
-                        if price:
-                            print(f"[RunPodAdapter] Found price for {gpu_type}: ${price}/hr (matched: {display_name})")
-                            return float(price)
-                
-                print(f"[RunPodAdapter] No matching GPU type found for: {gpu_type}")
-                return None
-                
-        except Exception as e:
-            print(f"[RunPodAdapter] Failed to get pricing: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+            data = await self._execute("prices")
+            
+            if "errors" in data or "data" not in data:
+                logger.warning("Pricing API returned errors: %s", data.get("errors"))
+                return {}
+            
+            prices = {}
+            for gpu in data["data"].get("gpuTypes", []):
+                # Use uninterruptable (on-demand) price
+                price = (gpu.get("lowestPrice") or {}).get("uninterruptablePrice")
+                if not price:
+                    continue
+                # displayName examples: "RTX 4090", "RTX 3090"
+                # id examples: "NVIDIA GeForce RTX 4090"
+                for name in (gpu.get("displayName"), gpu.get("id")):
+                    if name:
+                        prices[_alias_key(name)] = float(price)
+            return prices
+            
+        except Exception:
+            logger.exception("Failed to get pricing")
+            return {}
     
     async def check_gpu_availability(self, gpu_type: str) -> Dict[str, Any]:
         """
@@ -564,82 +1238,129 @@ class RunPodAdapter(ProviderAdapter):
         if not self.api_key:
             raise ValueError("RUNPOD_API_KEY not configured")
         
-        # Map GPU type
-        runpod_gpu_type = GPU_TYPE_MAPPING.get(gpu_type, gpu_type)
+        key = (self._scope, gpu_type)
+        cached = _get_cached(_availability_cache, key)
+        if cached is not None:
+            return dict(cached)
         
-        # GraphQL query to get GPU availability
-        query = """
-        query($gpuId: String!) {
-          gpuTypes(input: {id: $gpuId}) {
-            id
-            displayName
-            lowestPrice(input: {
-              gpuCount: 1
-              secureCloud: true
-            }) {
-              stockStatus
-              maxUnreservedGpuCount
-              uninterruptablePrice
-            }
-          }
-        }
+        async with _cache_locks[("availability", *key)]:
+            cached = _get_cached(_availability_cache, key)
+            if cached is not None:
+                return dict(cached)
+            
+            result = await shared_fetch(
+                f"runpod:availability:{self._scope}:{gpu_type}",
+                AVAILABILITY_CACHE_TTL_SECONDS,
+                lambda: self._fetch_availability(gpu_type)
+            )
+            _availability_cache[key] = (result, time.monotonic() + AVAILABILITY_CACHE_TTL_SECONDS)
+            return dict(result)
+    
+    async def _fetch_availability(self, gpu_type: str) -> Dict[str, Any]:
+        """
+        Queue gpu_type for the next batched stock query.
+        Lookups arriving within AVAILABILITY_BATCH_DELAY_SECONDS (per API key)
+        share one request, sent with that key.
         """
+        batch = _availability_batches.get(self.api_key)
+        if batch is None:
+            batch = _availability_batches[self.api_key] = {}
+            task = asyncio.create_task(self._run_availability_batch(batch))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
         
-        variables = {"gpuId": runpod_gpu_type}
+        future = batch.get(gpu_type)
+        if future is None:
+            future = batch[gpu_type] = asyncio.get_running_loop().create_future()
+            if len(batch) >= AVAILABILITY_BATCH_MAX_SIZE:
+                # Full - later lookups start a new batch
+                _availability_batches.pop(self.api_key, None)
+        return await future
+    
+    async def _run_availability_batch(self, batch: Dict[str, asyncio.Future]):
+        """Wait for the batch window to close, then resolve every queued lookup"""
+        await asyncio.sleep(AVAILABILITY_BATCH_DELAY_SECONDS)
+        if _availability_batches.get(self.api_key) is batch:
+            del _availability_batches[self.api_key]
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": query, "variables": variables},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "errors" in data:
-                    raise Exception(f"GraphQL errors: {data['errors']}")
-                
-                gpu_types = data.get("data", {}).get("gpuTypes", [])
-                if not gpu_types:
-                    return {
-                        "available": False,
-                        "count": 0,
-                        "price": 0,
-                        "regions": []
-                    }
-                
-                gpu_data = gpu_types[0]
-                lowest_price = gpu_data.get("lowestPrice", {})
-                stock_status = lowest_price.get("stockStatus", "None")
-                max_count = lowest_price.get("maxUnreservedGpuCount", 0)
-                price = lowest_price.get("uninterruptablePrice", 0)
-                
-                # Map stock status to estimated count
-                stock_map = {
-                    "High": 10,
-                    "Medium": 5,
-                    "Low": 2,
-                    "None": 0
-                }
-                
-                estimated_count = stock_map.get(stock_status, 0)
-                # Use actual count if available
-                if max_count > 0:
-                    estimated_count = max_count
-                
-                return {
-                    "available": stock_status != "None" and estimated_count > 0,
-                    "count": estimated_count,
-                    "price": float(price) if price else 0,
-                    "regions": []  # RunPod doesn't expose region info
-                }
-                
+            results = await self._query_availability(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for gpu_type, future in batch.items():
+            if not future.done():
+                future.set_result(results[gpu_type])
+    
+    async def _query_availability(self, gpu_types: list[str]) -> Dict[str, Dict[str, Any]]:
+        """Query stock status for several GPU types in one aliased GraphQL request"""
+        # One aliased gpuTypes field per requested type: g0, g1, ...
+        aliases = {f"g{i}": gpu_type for i, gpu_type in enumerate(gpu_types)}
+        
+        # Map GPU type
+        variables = {
+            alias: GPU_TYPE_MAPPING.get(gpu_type, gpu_type)
+            for alias, gpu_type in aliases.items()
+        }
+        
+        try:
+            data = await self._post(
+                _encode_body(_availability_query(len(aliases)), variables), timeout=10.0
+            )
+            
+            if "errors" in data:
+                raise Exception(f"GraphQL errors: {data['errors']}")
+            
+            results = data.get("data") or {}
+            return {
+                gpu_type: self._parse_availability(results.get(alias) or [])
+                for alias, gpu_type in aliases.items()
+            }
+            
         except Exception as e:
-            print(f"[RunPodAdapter] Failed to check availability: {e}")
+            logger.warning("Failed to check availability: %s", e)
             raise Exception(f"RunPod availability check failed: {e}")
     
+    @staticmethod
+    def _parse_availability(gpu_types: list) -> Dict[str, Any]:
+        """Convert a gpuTypes result into the availability dict"""
+        if not gpu_types:
+            return {
+                "available": False,
+                "count": 0,
+                "price": 0,
+                "regions": []
+            }
+        
+        gpu_data = gpu_types[0]
+        lowest_price = gpu_data.get("lowestPrice") or {}
+        stock_status = lowest_price.get("stockStatus") or "None"
+        max_count = lowest_price.get("maxUnreservedGpuCount") or 0
+        price = lowest_price.get("uninterruptablePrice") or 0
+        
+        # Map stock status to estimated count
+        stock_map = {
+            "High": 10,
+            "Medium": 5,
+            "Low": 2,
+            "None": 0
+        }
+        
+        estimated_count = stock_map.get(stock_status, 0)
+        # Use actual count if available
+        if max_count > 0:
+            estimated_count = max_count
+        
+        return {
+            "available": stock_status != "None" and estimated_count > 0,
+            "count": estimated_count,
+            "price": float(price) if price else 0,
+            "regions": []  # RunPod doesn't expose region info
+        }
+    
     async def get_logs(
         self, 
         instance_id: str, 
@@ -649,32 +1370,19 @@ class RunPodAdapter(ProviderAdapter):
         """
         Get container logs from RunPod instance.
         """
-        from app.core.config import settings
-        from datetime import datetime
-        import random
-        
         if settings.DRY_RUN:
-            # Mock logs for testing
-            mock_logs = [
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Starting container...",
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Loading environment variables",
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Initializing GPU...",
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] GPU detected: NVIDIA RTX 4090",
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Loading model weights...",
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Model loaded successfully",
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Starting web server on port 7860...",
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Server ready! Listening on http://0.0.0.0:7860",
-                f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Waiting for requests...",
-            ]
+            # Mock logs for testing - one timestamp per call
+            ts = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
             
             # Simulate new logs if since is provided
             if since:
+                rng = self._rng
                 return [
-                    f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Processing request #{random.randint(1, 100)}",
-                    f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Request completed in {random.uniform(0.1, 2.0):.2f}s",
+                    f"[{ts}] Processing request #{rng.randint(1, 100)}",
+                    f"[{ts}] Request completed in {rng.uniform(0.1, 2.0):.2f}s",
                 ]
             
-            return mock_logs[-lines:]
+            return [f"[{ts}] {line}" for line in _MOCK_LOGS[-lines:]]
         
         # Real RunPod API call
         try:
@@ -686,23 +1394,21 @@ class RunPodAdapter(ProviderAdapter):
                 f"[INFO] Instance ID: {instance_id}"
             ]
         except Exception as e:
-            print(f"[RunPodAdapter] Failed to get logs: {e}")
+            logger.warning("Failed to get logs: %s", e)
             return [f"[ERROR] Failed to retrieve logs: {str(e)}"]
     
     async def get_metrics(self, instance_id: str) -> Dict[str, Any]:
         """Get performance metrics from RunPod instance."""
-        from app.core.config import settings
-        import random
-        
         if settings.DRY_RUN:
             # Mock metrics for testing
+            rng = self._rng
             return {
-                "gpu_utilization": random.uniform(70, 95),
-                "gpu_memory_utilization": random.uniform(60, 85),
-                "cpu_utilization": random.uniform(30, 50),
-                "ram_utilization": random.uniform(40, 70),
-                "network_rx_bytes": random.randint(1000000, 10000000),
-                "network_tx_bytes": random.randint(500000, 5000000)
+                "gpu_utilization": rng.uniform(70, 95),
+                "gpu_memory_utilization": rng.uniform(60, 85),
+                "cpu_utilization": rng.uniform(30, 50),
+                "ram_utilization": rng.uniform(40, 70),
+                "network_rx_bytes": rng.randint(1000000, 10000000),
+                "network_tx_bytes": rng.randint(500000, 5000000)
             }
         
         # Real RunPod API - would need to implement actual metrics fetching
@@ -1,9 +1,126 @@
+import asyncio
 import httpx
-import json
-import urllib.parse
-from typing import Dict, Any, Optional, List
+import logging
+import orjson
+import random
+import time
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Tuple
 from app.adapters.base import ProviderAdapter
 from app.core.config import settings
+from app.core.redis import shared_fetch
+
+logger = logging.getLogger(__name__)
+
+
+# 价格/库存缓存 / Pricing and offer caches: vast gpu name -> (value, expires_at)
+# Vast marketplace prices move on the order of minutes
+PRICING_CACHE_TTL_SECONDS = 60
+AVAILABILITY_CACHE_TTL_SECONDS = 60
+_pricing_cache: Dict[str, Tuple[float, float]] = {}
+_availability_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+# Rental listing per API key: api_key -> ({instance id: instance}, expires_at)
+# Status polls within the TTL share one /instances call
+INSTANCES_CACHE_TTL_SECONDS = 5
+_instances_cache: Dict[str, Tuple[Dict[str, Dict[str, Any]], float]] = {}
+# One in-flight fetch per key; concurrent callers wait for its result
+_cache_locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+# Vast actual_status -> deployment status (anything else is "error")
+_VAST_STATUS = MappingProxyType({
+    "running": "running",
+    "loading": "creating",
+    "creating": "creating",
+    "launching": "creating",
+    "stopped": "stopped",
+    "exited": "stopped",
+})
+
+
+# Retries for read-only requests (offer searches) on transient failures
+RETRY_ATTEMPTS = 3
+RETRY_INITIAL_SECONDS = 0.2
+RETRY_MAX_SECONDS = 2.0
+# After searches keep failing, skip the API for 2**failures seconds (capped)
+BREAKER_MAX_OPEN_SECONDS = 60.0
+
+
+class _CircuitBreaker:
+    """Failure state for the Vast API host, shared by every adapter"""
+    
+    __slots__ = ("failures", "open_until")
+    
+    def __init__(self):
+        self.failures = 0
+        self.open_until = 0.0
+    
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self.open_until
+    
+    def record_success(self):
+        self.failures = 0
+        self.open_until = 0.0
+    
+    def record_failure(self):
+        self.failures += 1
+        self.open_until = time.monotonic() + min(BREAKER_MAX_OPEN_SECONDS, 2 ** self.failures)
+
+
+_breaker = _CircuitBreaker()
+
+
+def _is_retryable(error: httpx.HTTPError) -> bool:
+    """Server-side and transport failures; client errors are not retried"""
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return code == 429 or code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def _get_cached(cache: Dict[str, Tuple[Any, float]], key: str) -> Optional[Any]:
+    """Return the cached value for key if it has not expired"""
+    entry = cache.get(key)
+    if entry and time.monotonic() < entry[1]:
+        return entry[0]
+    return None
+
+
+@lru_cache(maxsize=64)
+def _vast_gpu_name(gpu_type: str) -> str:
+    """Map e.g. RTX4090 to the "RTX 4090" spelling Vast uses"""
+    return gpu_type.replace("RTX", "RTX ") if "RTX" in gpu_type and "RTX " not in gpu_type else gpu_type
+
+
+@lru_cache(maxsize=128)
+def _offer_query(vast_gpu_name: str, verified: bool) -> str:
+    """Compact JSON /bundles search for single-GPU offers, cheapest first"""
+    query = {
+        "verified": {"eq": verified},
+        "rentable": {"eq": True},
+        "gpu_name": {"eq": vast_gpu_name},
+        "num_gpus": {"eq": 1},
+        "disk_space": {"gte": 20.0},
+        "external": {"eq": False},
+        "order": [["dph_total", "asc"]]  # Sort by price/hour ascending
+    }
+    return orjson.dumps(query).decode()
+
+
+@lru_cache(maxsize=64)
+def _availability_body(vast_gpu_name: str) -> bytes:
+    """Encoded on-demand /bundles/ search for verified offers of one GPU"""
+    query = {
+        "verified": {"eq": True},
+        "rentable": {"eq": True},
+        "gpu_name": {"eq": vast_gpu_name},
+        "order": [["dph_total", "asc"]]  # Sort by price ascending
+    }
+    return orjson.dumps({"q": query, "type": "on-demand"})
+
 
 class VastAdapter(ProviderAdapter):
     """
@@ -11,14 +128,52 @@ class VastAdapter(ProviderAdapter):
     API Docs: https://console.vast.ai/api/v0/
     """
     
-    def __init__(self, api_key: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+    # 所有实例共享一个连接池 / Connection pool shared by every adapter instance
+    _client: Optional[httpx.AsyncClient] = None
+    # Per-key headers are built from this once per adapter
+    _HEADERS_TEMPLATE = MappingProxyType({"Content-Type": "application/json"})
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.api_key = api_key or settings.VAST_API_KEY
         self.api_url = "https://console.vast.ai/api/v0"
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+        self.headers = {**self._HEADERS_TEMPLATE, "Authorization": f"Bearer {self.api_key}"}
         self.config = config or {}
+        # Injected client (e.g. for tests); defaults to the shared pool
+        self._http = client
+    
+    @classmethod
+    def open(cls) -> httpx.AsyncClient:
+        """Build the shared client up front (called on application startup)"""
+        return cls._get_client()
+    
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        """Return the shared AsyncClient, creating it on first use"""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                follow_redirects=True,
+                http2=True,
+                # Keep connections across 10s status-sync ticks (httpx default expiry is 5s)
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=60
+                )
+            )
+        return cls._client
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared client (called on application shutdown)"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
     
     async def create_instance(
         self, 
@@ -39,79 +194,58 @@ class VastAdapter(ProviderAdapter):
         # 1. Search for offers
         # Query format: URL encoded JSON string in 'q' parameter
         # GPU Name mapping might be needed if user passes "RTX4090" but Vast expects "RTX 4090"
-        vast_gpu_name = gpu_type.replace("RTX", "RTX ") if "RTX" in gpu_type and "RTX " not in gpu_type else gpu_type
-        
-        query = {
-            "verified": {"eq": True},
-            "rentable": {"eq": True},
-            "gpu_name": {"eq": vast_gpu_name},
-            "num_gpus": {"eq": 1},
-            "disk_space": {"gte": 20.0},
-            "external": {"eq": False},
-            "order": [["dph_total", "asc"]] # Sort by price/hour ascending
-        }
-        
-        query_str = urllib.parse.quote(json.dumps(query))
+        vast_gpu_name = _vast_gpu_name(gpu_type)
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                # Search
-                search_url = f"{self.api_url}/bundles?q={query_str}"
-                search_res = await client.get(search_url, headers=self.headers)
-                search_res.raise_for_status()
-                offers = search_res.json().get("offers", [])
-                
-                if not offers:
-                    # Try relaxed search (unverified)
-                    query["verified"] = {"eq": False}
-                    query_str = urllib.parse.quote(json.dumps(query))
-                    search_url = f"{self.api_url}/bundles?q={query_str}"
-                    search_res = await client.get(search_url, headers=self.headers)
-                    offers = search_res.json().get("offers", [])
-                
-                if not offers:
-                    raise Exception(f"No available Vast.ai offers found for {gpu_type}")
-                
-                # Pick the first one (cheapest due to sort)
-                best_offer = offers[0]
-                ask_id = best_offer["id"]
-                price = best_offer["dph_total"]
-                
-                print(f"[VastAdapter] Selected offer {ask_id}, price: ${price}/hr, Machine: {best_offer.get('machine_id')}")
+            client = self._http or self._get_client()
+            # Search
+            offers = await self._search_offers(vast_gpu_name)
+            
+            if not offers:
+                raise Exception(f"No available Vast.ai offers found for {gpu_type}")
+            
+            # Pick the first one (cheapest due to sort)
+            best_offer = offers[0]
+            ask_id = best_offer["id"]
+            price = best_offer["dph_total"]
+            
+            logger.info(
+                "Selected offer %s, price: $%s/hr, machine: %s", ask_id, price, best_offer.get("machine_id")
+            )
 
-                # 2. Rent Instance
-                # PUT /asks/{id}/
-                rent_url = f"{self.api_url}/asks/{ask_id}/"
-                rent_payload = {
-                    "image": image,
-                    "disk": 20.0,
-                    "env": env or {},
-                    "args_str": "", # Docker args
-                    "onstart": "",  # On-start script
-                    "runtype": "ssh", # Use SSH
-                }
-                
-                print(f"[VastAdapter] Renting {ask_id} with payload: {rent_payload}")
-                
-                try:
-                    rent_res = await client.put(rent_url, headers=self.headers, json=rent_payload)
-                    rent_res.raise_for_status()
-                except httpx.HTTPStatusError as e:
-                    print(f"[VastAdapter] Rent failed. Status: {e.response.status_code}")
-                    print(f"[VastAdapter] Response: {e.response.text}")
-                    raise Exception(f"Vast API Error ({e.response.status_code}): {e.response.text}")
-                
-                rent_data = rent_res.json()
-                
-                if not rent_data.get("success"):
-                     raise Exception(f"Vast rent failed: {rent_data}")
-                
-                new_instance_id = rent_data.get("new_contract")
-                
-                return {
-                    "instance_id": str(new_instance_id),
-                    "status": "creating"
-                }
+            # 2. Rent Instance
+            # PUT /asks/{id}/
+            rent_url = f"{self.api_url}/asks/{ask_id}/"
+            rent_payload = {
+                "image": image,
+                "disk": 20.0,
+                "env": env or {},
+                "args_str": "", # Docker args
+                "onstart": "",  # On-start script
+                "runtype": "ssh", # Use SSH
+            }
+            
+            logger.debug("Renting %s with payload: %s", ask_id, rent_payload)
+            
+            try:
+                rent_res = await client.put(rent_url, headers=self.headers, content=orjson.dumps(rent_payload))
+                rent_res.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                logger.error("Rent failed. Status: %s, response: %s", e.response.status_code, e.response.text)
+                raise Exception(f"Vast API Error ({e.response.status_code}): {e.response.text}")
+            
+            rent_data = orjson.loads(rent_res.content)
+            
+            if not rent_data.get("success"):
+                 raise Exception(f"Vast rent failed: {rent_data}")
+            
+            new_instance_id = rent_data.get("new_contract")
+            _instances_cache.pop(self.api_key, None)
+            
+            return {
+                "instance_id": str(new_instance_id),
+                "status": "creating"
+            }
 
         except httpx.HTTPError as e:
             # Check if we already handled it as HTTPStatusError
@@ -119,6 +253,67 @@ class VastAdapter(ProviderAdapter):
                 raise
             raise Exception(f"Vast API Error: {str(e)}")
 
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send an idempotent request, retrying transient failures with jittered
+        exponential backoff. Fails fast while the circuit breaker is open.
+        """
+        if _breaker.is_open:
+            raise Exception("Vast.ai API temporarily unavailable (circuit open)")
+        
+        client = self._http or self._get_client()
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            try:
+                response = await client.request(method, url, **kwargs)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                if not _is_retryable(e):
+                    raise
+                if attempt == RETRY_ATTEMPTS:
+                    _breaker.record_failure()
+                    raise
+                delay = min(RETRY_MAX_SECONDS, RETRY_INITIAL_SECONDS * 2 ** (attempt - 1))
+                delay += random.uniform(0, delay)
+                logger.warning(
+                    "Vast request failed (%s), retry %d in %.2fs", type(e).__name__, attempt, delay
+                )
+                await asyncio.sleep(delay)
+            else:
+                _breaker.record_success()
+                return response
+    
+    async def _search_offers(
+        self,
+        vast_gpu_name: str,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search verified and unverified offers concurrently.
+        Verified offers win when there are any; the unverified search is
+        only the fallback (previously a second, serial request).
+        """
+        extra = {} if timeout is None else {"timeout": timeout}
+        verified_res, unverified_res = await asyncio.gather(
+            *(
+                self._request(
+                    "GET",
+                    f"{self.api_url}/bundles",
+                    params={"q": _offer_query(vast_gpu_name, verified)},
+                    headers=self.headers,
+                    **extra
+                )
+                for verified in (True, False)
+            ),
+            return_exceptions=True
+        )
+        if isinstance(verified_res, BaseException):
+            raise verified_res
+        
+        offers = orjson.loads(verified_res.content).get("offers", [])
+        if offers or isinstance(unverified_res, BaseException):
+            return offers
+        return orjson.loads(unverified_res.content).get("offers", [])
+    
     async def get_status(self, instance_id: str, exposed_port: int = 8888) -> Dict[str, Any]:
         """
         Get instance status by listing all instances and finding matching ID.
@@ -127,83 +322,94 @@ class VastAdapter(ProviderAdapter):
             raise ValueError("VAST_API_KEY not configured")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                # Vast doesn't have a reliable single-instance GET endpoint docs-wise, 
-                # but /instances returns all current rentals.
-                res = await client.get(f"{self.api_url}/instances", headers=self.headers)
-                res.raise_for_status()
-                instances = res.json().get("instances", [])
-                
-                # Find our instance
-                instance = next((i for i in instances if str(i.get("id")) == str(instance_id)), None)
-                
-                if not instance:
-                    return {
-                        "status": "deleted", 
-                        "endpoint": None, 
-                        "ssh_connection_string": None
-                    }
-                
-                # Parse status
-                # actual_status: 'running', 'loading', 'creating', 'stopped'
-                actual_status = instance.get("actual_status", "unknown").lower()
-                status = "unknown"
-                
-                if actual_status == "running":
-                    status = "running"
-                elif actual_status in ["loading", "creating", "launching"]:
-                    status = "creating"
-                elif actual_status in ["stopped", "exited"]:
-                    status = "stopped"
-                else:
-                    status = "error" # or creating?
-                
-                # Extract Ports
-                # Vast provides SSH info directly
-                ssh_host = instance.get("ssh_host")
-                ssh_port = instance.get("ssh_port")
-                ssh_connection_string = None
-                if ssh_host and ssh_port:
-                    ssh_connection_string = f"ssh root@{ssh_host} -p {ssh_port}"
-                
-                # Find Jupyter Port (usually mapped from 8888)
-                endpoint = None
-                ports = instance.get("ports", {})
-                # ports structure in Vast json is sometimes dict: {"8888/tcp": [{"HostIp": "...", "HostPort": "..."}]}
-                # Or sometimes just list. Need to be robust. 
-                # Vast usually exposes direct port mapping.
-                # If we don't find 8888 mapping, we rely on SSH tunneling or check docs.
-                # For now, MVP: Just implement SSH. Jupyter URL construction requires knowing the mapped port.
-                
-                # Try to find mapping for 8888
-                # Vast 'ports' field is not always populated in the text summary object.
-                # However, instance object usually has 'port_mappings'.
-                # Let's check keys.
-                
+            # Find our instance
+            instance = (await self._list_instances()).get(str(instance_id))
+            
+            if not instance:
                 return {
-                    "status": status,
-                    "endpoint": endpoint, # To be implemented if we can parse port 8888 mapping
-                    "ssh_connection_string": ssh_connection_string,
-                    "uptime_seconds": instance.get("uptime", 0),
-                    "vcpu_count": instance.get("cpu_cores"),
-                    "ram_gb": instance.get("cpu_ram") / 1024 if instance.get("cpu_ram") else 0,
-                    "storage_gb": instance.get("disk_space"),
-                    "gpu_utilization": instance.get("gpu_util"), 
-                    "gpu_memory_utilization": None # Vast might check this
+                    "status": "deleted", 
+                    "endpoint": None, 
+                    "ssh_connection_string": None
                 }
+            
+            # Parse status
+            # actual_status: 'running', 'loading', 'creating', 'stopped'
+            actual_status = (instance.get("actual_status") or "unknown").lower()
+            status = _VAST_STATUS.get(actual_status, "error")  # or creating?
+            
+            # Extract Ports
+            # Vast provides SSH info directly
+            ssh_host = instance.get("ssh_host")
+            ssh_port = instance.get("ssh_port")
+            ssh_connection_string = None
+            if ssh_host and ssh_port:
+                ssh_connection_string = f"ssh root@{ssh_host} -p {ssh_port}"
+            
+            # Find Jupyter Port (usually mapped from 8888)
+            endpoint = None
+            # ports structure in Vast json is sometimes dict: {"8888/tcp": [{"HostIp": "...", "HostPort": "..."}]}
+            # Or sometimes just list. Need to be robust. 
+            # Vast usually exposes direct port mapping.
+            # If we don't find 8888 mapping, we rely on SSH tunneling or check docs.
+            # For now, MVP: Just implement SSH. Jupyter URL construction requires knowing the mapped port.
+            
+            # Try to find mapping for 8888
+            # Vast 'ports' field is not always populated in the text summary object.
+            # However, instance object usually has 'port_mappings'.
+            # Let's check keys.
+            
+            cpu_ram = instance.get("cpu_ram")
+            return {
+                "status": status,
+                "endpoint": endpoint, # To be implemented if we can parse port 8888 mapping
+                "ssh_connection_string": ssh_connection_string,
+                "uptime_seconds": instance.get("uptime", 0),
+                "vcpu_count": instance.get("cpu_cores"),
+                "ram_gb": cpu_ram / 1024 if cpu_ram else 0,
+                "storage_gb": instance.get("disk_space"),
+                "gpu_utilization": instance.get("gpu_util"), 
+                "gpu_memory_utilization": None # Vast might check this
+            }
 
         except httpx.HTTPError as e:
             raise Exception(f"Failed to get Vast status: {str(e)}")
 
+    async def _list_instances(self) -> Dict[str, Dict[str, Any]]:
+        """
+        All current rentals for this API key, keyed by instance id.
+        Cached for INSTANCES_CACHE_TTL_SECONDS so concurrent status polls
+        share one request.
+        """
+        cached = _get_cached(_instances_cache, self.api_key)
+        if cached is not None:
+            return cached
+        
+        async with _cache_locks[("instances", self.api_key)]:
+            cached = _get_cached(_instances_cache, self.api_key)
+            if cached is not None:
+                return cached
+            
+            client = self._http or self._get_client()
+            # Vast doesn't have a reliable single-instance GET endpoint docs-wise, 
+            # but /instances returns all current rentals.
+            res = await client.get(f"{self.api_url}/instances", headers=self.headers)
+            res.raise_for_status()
+            instances = {
+                str(i.get("id")): i for i in orjson.loads(res.content).get("instances", [])
+            }
+            _instances_cache[self.api_key] = (instances, time.monotonic() + INSTANCES_CACHE_TTL_SECONDS)
+            return instances
+    
     async def delete_instance(self, instance_id: str) -> bool:
         if not self.api_key:
             raise ValueError("VAST_API_KEY not configured")
             
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                res = await client.delete(f"{self.api_url}/instances/{instance_id}/", headers=self.headers)
-                res.raise_for_status()
-                return True
+            client = self._http or self._get_client()
+            res = await client.delete(f"{self.api_url}/instances/{instance_id}/", headers=self.headers)
+            res.raise_for_status()
+            _instances_cache.pop(self.api_key, None)
+            return True
         except httpx.HTTPError as e:
              raise Exception(f"Failed to delete Vast instance: {str(e)}")
 
@@ -212,10 +418,11 @@ class VastAdapter(ProviderAdapter):
             raise ValueError("VAST_API_KEY not configured")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                res = await client.put(f"{self.api_url}/instances/{instance_id}/stop/", headers=self.headers, json={})
-                res.raise_for_status()
-                return True
+            client = self._http or self._get_client()
+            res = await client.put(f"{self.api_url}/instances/{instance_id}/stop/", headers=self.headers, content=b"{}")
+            res.raise_for_status()
+            _instances_cache.pop(self.api_key, None)
+            return True
         except httpx.HTTPError as e:
              raise Exception(f"Failed to stop Vast instance: {str(e)}")
              
@@ -224,10 +431,11 @@ class VastAdapter(ProviderAdapter):
             raise ValueError("VAST_API_KEY not configured")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                res = await client.put(f"{self.api_url}/instances/{instance_id}/start/", headers=self.headers, json={})
-                res.raise_for_status()
-                return True
+            client = self._http or self._get_client()
+            res = await client.put(f"{self.api_url}/instances/{instance_id}/start/", headers=self.headers, content=b"{}")
+            res.raise_for_status()
+            _instances_cache.pop(self.api_key, None)
+            return True
         except httpx.HTTPError as e:
              raise Exception(f"Failed to start Vast instance: {str(e)}")
 
@@ -237,10 +445,11 @@ class VastAdapter(ProviderAdapter):
             raise ValueError("VAST_API_KEY not configured")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                res = await client.put(f"{self.api_url}/instances/{instance_id}/reboot/", headers=self.headers, json={})
-                res.raise_for_status()
-                return True
+            client = self._http or self._get_client()
+            res = await client.put(f"{self.api_url}/instances/{instance_id}/reboot/", headers=self.headers, content=b"{}")
+            res.raise_for_status()
+            _instances_cache.pop(self.api_key, None)
+            return True
         except httpx.HTTPError as e:
              raise Exception(f"Failed to restart Vast instance: {str(e)}")
     
@@ -249,54 +458,51 @@ class VastAdapter(ProviderAdapter):
         Get current price per hour for the given GPU type from Vast.ai.
         Uses the same search logic as create_instance to find cheapest available offer.
         Falls back to static pricing if API call fails.
+        Successful lookups are cached for PRICING_CACHE_TTL_SECONDS.
         """
         if not self.api_key:
             return self._get_fallback_price(gpu_type)
         
         # Map GPU type (same as in create_instance)
-        vast_gpu_name = gpu_type.replace("RTX", "RTX ") if "RTX" in gpu_type and "RTX " not in gpu_type else gpu_type
-        
-        query = {
-            "verified": {"eq": True},
-            "rentable": {"eq": True},
-            "gpu_name": {"eq": vast_gpu_name},
-            "num_gpus": {"eq": 1},
-            "disk_space": {"gte": 20.0},
-            "external": {"eq": False},
-            "order": [["dph_total", "asc"]]  # Sort by price/hour ascending
-        }
+        vast_gpu_name = _vast_gpu_name(gpu_type)
         
-        query_str = urllib.parse.quote(json.dumps(query))
+        cached = _get_cached(_pricing_cache, vast_gpu_name)
+        if cached is not None:
+            return cached
         
-        try:
-            async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-                search_url = f"{self.api_url}/bundles?q={query_str}"
-                search_res = await client.get(search_url, headers=self.headers)
-                
-                if not search_res.is_success:
-                    print(f"[VastAdapter] API call failed, using fallback pricing")
-                    return self._get_fallback_price(gpu_type)
-                
-                offers = search_res.json().get("offers", [])
-                
-                if not offers:
-                    # Try relaxed search (unverified)
-                    query["verified"] = {"eq": False}
-                    query_str = urllib.parse.quote(json.dumps(query))
-                    search_url = f"{self.api_url}/bundles?q={query_str}"
-                    search_res = await client.get(search_url, headers=self.headers)
-                    offers = search_res.json().get("offers", [])
-                
-                if offers:
-                    # Return the cheapest price (first one due to sort)
-                    return float(offers[0].get("dph_total", 0))
-                
-                print(f"[VastAdapter] No offers found, using fallback pricing")
+        async with _cache_locks[("pricing", vast_gpu_name)]:
+            cached = _get_cached(_pricing_cache, vast_gpu_name)
+            if cached is not None:
+                return cached
+            
+            price = await shared_fetch(
+                f"vast:price:{vast_gpu_name}",
+                PRICING_CACHE_TTL_SECONDS,
+                lambda: self._query_price(vast_gpu_name)
+            )
+            if price is None:
                 return self._get_fallback_price(gpu_type)
-                
+            
+            _pricing_cache[vast_gpu_name] = (price, time.monotonic() + PRICING_CACHE_TTL_SECONDS)
+            return price
+    
+    async def _query_price(self, vast_gpu_name: str) -> Optional[float]:
+        """Cheapest on-demand offer for vast_gpu_name (uncached); None on failure"""
+        try:
+            offers = await self._search_offers(vast_gpu_name, timeout=10.0)
+        except httpx.HTTPStatusError:
+            logger.warning("Pricing API call failed, using fallback pricing")
+            return None
         except Exception as e:
-            print(f"[VastAdapter] Failed to get pricing: {e}, using fallback pricing")
-            return self._get_fallback_price(gpu_type)
+            logger.warning("Failed to get pricing: %s, using fallback pricing", e)
+            return None
+        
+        if offers:
+            # Return the cheapest price (first one due to sort)
+            return float(offers[0].get("dph_total", 0))
+        
+        logger.info("No offers found for %s, using fallback pricing", vast_gpu_name)
+        return None
     
     def _get_fallback_price(self, gpu_type: str) -> float:
         """Fallback static pricing for common GPU types"""
@@ -329,58 +535,85 @@ class VastAdapter(ProviderAdapter):
             raise ValueError("VAST_API_KEY not configured")
         
         # Convert GPU type to Vast.ai format
-        vast_gpu_name = gpu_type.replace("RTX", "RTX ") if "RTX" in gpu_type and "RTX " not in gpu_type else gpu_type
+        vast_gpu_name = _vast_gpu_name(gpu_type)
         
-        # Search for offers
-        query = {
-            "verified": {"eq": True},
-            "rentable": {"eq": True},
-            "gpu_name": {"eq": vast_gpu_name},
-            "order": [["dph_total", "asc"]]  # Sort by price ascending
-        }
+        cached = _get_cached(_availability_cache, vast_gpu_name)
+        if cached is not None:
+            return dict(cached)
         
+        async with _cache_locks[("availability", vast_gpu_name)]:
+            cached = _get_cached(_availability_cache, vast_gpu_name)
+            if cached is not None:
+                return dict(cached)
+            
+            result = await shared_fetch(
+                f"vast:availability:{vast_gpu_name}",
+                AVAILABILITY_CACHE_TTL_SECONDS,
+                lambda: self._query_availability(vast_gpu_name)
+            )
+            _availability_cache[vast_gpu_name] = (
+                result, time.monotonic() + AVAILABILITY_CACHE_TTL_SECONDS
+            )
+            return dict(result)
+    
+    async def _query_availability(self, vast_gpu_name: str) -> Dict[str, Any]:
+        """Search on-demand offers for vast_gpu_name (uncached)"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_url}/bundles/",
-                    headers=self.headers,
-                    json={"q": query, "type": "on-demand"},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                offers = data.get("offers", [])
-                
-                if not offers:
-                    return {
-                        "available": False,
-                        "count": 0,
-                        "price": 0,
-                        "regions": []
-                    }
-                
-                # Get cheapest offer
-                cheapest = min(offers, key=lambda x: x.get("dph_total", float('inf')))
-                
-                # Get unique regions
-                regions = list(set(
-                    offer.get("geolocation", "Unknown") 
-                    for offer in offers 
-                    if offer.get("geolocation")
-                ))
-                
+            # Search for offers
+            response = await self._request(
+                "POST",
+                f"{self.api_url}/bundles/",
+                headers=self.headers,
+                content=_availability_body(vast_gpu_name),
+                timeout=10.0
+            )
+            data = orjson.loads(response.content)
+            
+            offers = data.get("offers", [])
+            
+            if not offers:
                 return {
-                    "available": True,
-                    "count": len(offers),
-                    "price": cheapest.get("dph_total", 0),
-                    "regions": regions
+                    "available": False,
+                    "count": 0,
+                    "price": 0,
+                    "regions": []
                 }
-                
+            
+            # Get cheapest offer
+            cheapest = min(offers, key=lambda x: x.get("dph_total", float('inf')))
+            
+            # Get unique regions
+            regions = list(set(
+                offer.get("geolocation", "Unknown") 
+                for offer in offers 
+                if offer.get("geolocation")
+            ))
+            
+            return {
+                "available": True,
+                "count": len(offers),
+                "price": cheapest.get("dph_total", 0),
+                "regions": regions
+            }
+            
         except Exception as e:
-            print(f"[VastAdapter] Failed to check availability: {e}")
+            logger.warning("Failed to check availability: %s", e)
             raise Exception(f"Vast.ai availability check failed: {e}")
     
+    async def check_availability_bulk(self, gpu_types: List[str]) -> Dict[str, Any]:
+        """
+        Check availability for several GPU types concurrently
+        
+        The searches multiplex over the shared HTTP/2 connection instead of
+        opening one connection per GPU type. Maps each GPU type to its
+        availability dict, or to the exception raised for that type.
+        """
+        results = await asyncio.gather(
+            *(self.check_gpu_availability(gpu_type) for gpu_type in gpu_types),
+            return_exceptions=True
+        )
+        return dict(zip(gpu_types, results))
+    
     async def get_logs(
         self, 
         instance_id: str, 
@@ -1,50 +1,92 @@
-from typing import List
+import hashlib
+import os
+import time
+from typing import List, Optional, Tuple
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel import Session, select
-from app.core.db import get_session
+from app.core.db import get_session, upsert_settings
 from app.core.models import Provider, User, ProviderType, SystemSetting
 
 router = APIRouter()
 
+CLERK_KEY_SETTING = "NEXT_PUBLIC_CLERK_PUBLISHABLE_KEY"
+PUBLIC_CONFIG_MAX_AGE_SECONDS = 300
+
+# Resolved /config/public payload, its ETag and monotonic expires_at. Cleared
+# when this worker writes the Clerk key setting; the expiry bounds how long
+# other workers keep serving the old key.
+_public_config_cache: Optional[Tuple[bytes, str, float]] = None
+
+
+def invalidate_public_config(key: Optional[str] = None):
+    """Drop the cached public config (if key is given, only when it is the Clerk key)"""
+    global _public_config_cache
+    if key is None or key == CLERK_KEY_SETTING:
+        _public_config_cache = None
+
+
 @router.get("/config/public")
-async def get_public_config(session: Session = Depends(get_session)):
+async def get_public_config(request: Request, session: Session = Depends(get_session)):
     """Get public configuration for frontend initialization."""
-    import os
-    # Try env var first, then database
-    clerk_key = os.getenv("NEXT_PUBLIC_CLERK_PUBLISHABLE_KEY")
-    if not clerk_key:
-        setting = session.get(SystemSetting, "NEXT_PUBLIC_CLERK_PUBLISHABLE_KEY")
-        clerk_key = setting.value if setting else None
+    global _public_config_cache
+    if _public_config_cache is None or _public_config_cache[2] <= time.monotonic():
+        # Try env var first, then database
+        clerk_key = os.getenv(CLERK_KEY_SETTING)
+        if not clerk_key:
+            setting = session.get(SystemSetting, CLERK_KEY_SETTING)
+            clerk_key = setting.value if setting else None
         
-    return {
-        "clerkPublishableKey": clerk_key
+        body = orjson.dumps({"clerkPublishableKey": clerk_key})
+        _public_config_cache = (
+            body,
+            f'"{hashlib.md5(body).hexdigest()}"',
+            time.monotonic() + PUBLIC_CONFIG_MAX_AGE_SECONDS
+        )
+    
+    body, etag, _ = _public_config_cache
+    headers = {
+        "Cache-Control": f"public, max-age={PUBLIC_CONFIG_MAX_AGE_SECONDS}",
+        "ETag": etag
     }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 
 @router.get("/settings", response_model=List[SystemSetting])
-async def list_settings(session: Session = Depends(get_session)):
-    """List all system settings."""
-    return session.exec(select(SystemSetting)).all()
+async def list_settings(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    session: Session = Depends(get_session)
+):
+    """List system settings, ordered by key."""
+    return session.exec(
+        select(SystemSetting).order_by(SystemSetting.key).offset(skip).limit(limit)
+    ).all()
 
 @router.post("/settings", response_model=SystemSetting)
 async def update_setting(setting: SystemSetting, session: Session = Depends(get_session)):
     """Create or Update a system setting."""
-    existing = session.get(SystemSetting, setting.key)
-    if existing:
-        existing.value = setting.value
-        existing.description = setting.description or existing.description
-        existing.is_secret = setting.is_secret
-        existing.updated_at = datetime.utcnow()
-        session.add(existing)
-    else:
-        setting.updated_at = datetime.utcnow()
-        session.add(setting)
-    
+    stored, = upsert_settings(
+        session,
+        [{
+            "key": setting.key,
+            "value": setting.value,
+            "description": setting.description,
+            "is_secret": setting.is_secret,
+            "updated_at": datetime.utcnow()
+        }],
+        update_columns=("value", "description", "is_secret", "updated_at"),
+        keep_existing=("description",)
+    )
+    # Read the RETURNING row before commit expires it
+    result = stored.model_dump()
     session.commit()
-    session.refresh(existing if existing else setting)
-    return existing if existing else setting
+    invalidate_public_config(setting.key)
+    return result
 
 @router.get("/settings/{key}", response_model=SystemSetting)
 async def get_setting(key: str, session: Session = Depends(get_session)):
@@ -57,9 +99,15 @@ async def get_setting(key: str, session: Session = Depends(get_session)):
 
 
 @router.get("/providers", response_model=List[Provider])
-async def list_providers(session: Session = Depends(get_session)):
-    """List all configured providers."""
-    providers = session.exec(select(Provider)).all()
+async def list_providers(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    session: Session = Depends(get_session)
+):
+    """List configured providers, ordered by id."""
+    providers = session.exec(
+        select(Provider).order_by(Provider.id).offset(skip).limit(limit)
+    ).all()
     return providers
 
 @router.post("/providers", response_model=Provider)
@@ -1,9 +1,13 @@
+import heapq
+from itertools import islice
 from typing import Dict, Any
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends
+from sqlalchemy import case
 from sqlmodel import Session, select, func
 from app.core.db import get_session
 from app.core.models import User, Deployment, DeploymentStatus, Provider
+from app.core.platform_stats import get_platform_stats_snapshot
 
 router = APIRouter()
 
@@ -11,49 +15,44 @@ router = APIRouter()
 async def get_platform_stats(session: Session = Depends(get_session)):
     """
     Get comprehensive platform statistics.
-    Aggregates data from users, deployments, and providers.
+    User and deployment totals come from the pre-aggregated snapshot.
     """
-    # Get all users
-    users = session.exec(select(User)).all()
+    snapshot = get_platform_stats_snapshot(session)
+    plan_counts = snapshot["users_by_plan"]
+    status_counts = snapshot["deployments_by_status"]
+    
+    # Weekly signups depend on the current time, so they are not in the snapshot
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    new_this_week = session.exec(
+        select(func.count()).select_from(User).where(User.created_at >= week_ago)
+    ).one()
     
-    # Calculate user stats
     user_stats = {
-        "total": len(users),
+        "total": sum(plan_counts.values()),
         "by_plan": {
-            "free": len([u for u in users if u.plan == "free"]),
-            "pro": len([u for u in users if u.plan == "pro"]),
-            "team": len([u for u in users if u.plan == "team"]),
-            "enterprise": len([u for u in users if u.plan == "enterprise"])
+            plan: plan_counts.get(plan, 0)
+            for plan in ("free", "pro", "team", "enterprise")
         },
-        "new_this_week": 0  # TODO: Calculate based on created_at
+        "new_this_week": new_this_week
     }
     
-    # Calculate new users this week
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    new_users = [u for u in users if u.created_at >= week_ago]
-    user_stats["new_this_week"] = len(new_users)
-    
-    # Get all deployments
-    deployments = session.exec(select(Deployment)).all()
-    
-    # Calculate deployment stats
     deployment_stats = {
-        "total": len(deployments),
-        "active": len([d for d in deployments if d.status == DeploymentStatus.RUNNING]),
+        "total": sum(status_counts.values()),
+        "active": status_counts.get(DeploymentStatus.RUNNING.value, 0),
         "by_status": {
-            "running": len([d for d in deployments if d.status == DeploymentStatus.RUNNING]),
-            "stopped": len([d for d in deployments if d.status == DeploymentStatus.STOPPED]),
-            "creating": len([d for d in deployments if d.status == DeploymentStatus.CREATING]),
-            "error": len([d for d in deployments if d.status == DeploymentStatus.ERROR]),
-            "deleted": len([d for d in deployments if d.status == DeploymentStatus.DELETED])
+            status.value: status_counts.get(status.value, 0)
+            for status in (
+                DeploymentStatus.RUNNING,
+                DeploymentStatus.STOPPED,
+                DeploymentStatus.CREATING,
+                DeploymentStatus.ERROR,
+                DeploymentStatus.DELETED
+            )
         }
     }
     
     # Calculate usage statistics
-    total_gpu_hours = 0.0
-    for deployment in deployments:
-        if deployment.uptime_seconds:
-            total_gpu_hours += deployment.uptime_seconds / 3600.0
+    total_gpu_hours = snapshot["total_uptime_seconds"] / 3600.0
     
     # Calculate estimated cost ($0.50/hour average)
     total_cost = total_gpu_hours * 0.50
@@ -64,10 +63,15 @@ async def get_platform_stats(session: Session = Depends(get_session)):
     }
     
     # Get provider stats
-    providers = session.exec(select(Provider)).all()
+    provider_total, provider_enabled = session.exec(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((Provider.is_enabled == True, 1), else_=0)), 0)
+        ).select_from(Provider)
+    ).one()
     provider_stats = {
-        "total": len(providers),
-        "enabled": len([p for p in providers if p.is_enabled])
+        "total": provider_total,
+        "enabled": provider_enabled
     }
     
     # Revenue stats (placeholder for now)
@@ -108,31 +112,34 @@ async def get_recent_activity(
     )
     recent_deployments_raw = session.exec(recent_deployments_query).all()
     
-    # Format activity items
-    activity = []
-    
-    # Add user signups
-    for user in recent_users:
-        activity.append({
+    # Both lists are already newest-first: merge lazily, stop after `limit`
+    user_events = (
+        {
             "type": "user_signup",
-            "timestamp": user.created_at.isoformat(),
+            "timestamp": user.created_at,
             "description": f"{user.email} signed up ({user.plan.upper()})",
             "user_email": user.email,
             "plan": user.plan
-        })
-    
-    # Add deployments
-    for deployment, user in recent_deployments_raw:
-        activity.append({
+        }
+        for user in recent_users
+    )
+    deployment_events = (
+        {
             "type": "deployment_created",
-            "timestamp": deployment.created_at.isoformat(),
+            "timestamp": deployment.created_at,
             "description": f"{deployment.name} created by {user.email}",
             "deployment_name": deployment.name,
             "user_email": user.email,
             "gpu_type": deployment.gpu_type
-        })
+        }
+        for deployment, user in recent_deployments_raw
+    )
+    merged = heapq.merge(
+        user_events, deployment_events, key=lambda x: x["timestamp"], reverse=True
+    )
     
-    # Sort by timestamp (most recent first)
-    activity.sort(key=lambda x: x["timestamp"], reverse=True)
+    activity = list(islice(merged, limit))
+    for item in activity:
+        item["timestamp"] = item["timestamp"].isoformat()
     
-    return activity[:limit]
+    return activity
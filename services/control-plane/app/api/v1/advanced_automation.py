@@ -6,15 +6,19 @@ Pos: Phase 9 Week 2 高级自动化的 API 层,提供 16 个端点供前端调
 一旦我被更新,务必更新我的开头注释,以及所属的文件夹的 README.md
 """
 
+import orjson
 from typing import Optional, List
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
 from pydantic import BaseModel
 
 from app.core.db import get_session
-from app.core.auth import verify_token
+from app.core.auth import verify_token, resolve_clerk_user
 from app.core.models import User, Deployment
+from app.core.provider_manager import get_provider_adapters
+from app.utils.pagination import apply_keyset, next_cursor
+from app.utils.http_cache import make_etag, not_modified
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 security = HTTPBearer()
@@ -26,38 +30,7 @@ def get_current_user(
     token = credentials.credentials
     payload = verify_token(token, session)
     
-    clerk_id = payload.get("sub")
-    if not clerk_id:
-        raise HTTPException(status_code=401, detail="Invalid token: missing sub")
-        
-    # Lazy User Creation / Sync
-    user = session.exec(select(User).where(User.clerk_id == clerk_id)).first()
-    
-    if not user:
-        email = payload.get("email")
-        if not email:
-            email = f"{clerk_id}@clerk.user" 
-            
-        existing_email_user = session.exec(select(User).where(User.email == email)).first()
-        if existing_email_user:
-            existing_email_user.clerk_id = clerk_id
-            existing_email_user.auth_provider = "clerk"
-            session.add(existing_email_user)
-            session.commit()
-            session.refresh(existing_email_user)
-            return existing_email_user
-        
-        user = User(
-            email=email,
-            clerk_id=clerk_id,
-            auth_provider="clerk",
-            plan="free"
-        )
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        
-    return user
+    return resolve_clerk_user(payload, session)
 
 from app.core.automation_models import (
     PriceHistory,
@@ -68,7 +41,9 @@ from app.core.automation_models import (
     TaskStatus,
     TaskType
 )
-from app.scheduler.price_monitor import PriceMonitor
+from app.scheduler.price_monitor import (
+    PriceMonitor, get_cached_response, cache_response
+)
 from app.scheduler.auto_migration import MigrationManager
 from app.scheduler.failover_manager import FailoverManager
 from app.scheduler.task_queue import TaskQueueManager
@@ -107,27 +82,32 @@ class BatchTaskCreate(BaseModel):
     scheduled_at: Optional[datetime] = None
 
 
+def _get_owned(session: Session, model, item_id: int, user_id: int):
+    """
+    Load row item_id of model only if it belongs to user_id, in one query.
+    Missing and foreign rows both come back as None.
+    """
+    return session.exec(
+        select(model).where(model.id == item_id, model.user_id == user_id)
+    ).first()
+
+
+def _owns_deployment(session: Session, deployment_id: int, user_id: int) -> bool:
+    """Ownership check that reads only the id column"""
+    return session.exec(
+        select(Deployment.id).where(Deployment.id == deployment_id, Deployment.user_id == user_id)
+    ).first() is not None
+
+
 # ==================== Price Monitoring ====================
 
-@router.get("/price-history")
-async def get_price_history(
-    deployment_id: int,
-    hours: int = Query(168, description="Time window in hours (default: 7 days)"),
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
-):
-    """Get price history for a deployment."""
-    # Verify ownership
-    deployment = session.get(Deployment, deployment_id)
-    if not deployment or deployment.user_id != current_user.id:
-        raise HTTPException(status_code=404, detail="Deployment not found")
-    
-    # Get price monitor
-    price_monitor = PriceMonitor()
-    
-    # Get price history
-    history = price_monitor.get_price_history(deployment_id, hours, session)
-    
+# Price history is append-only, so clients may reuse it briefly and then
+# revalidate with the ETag
+PRICE_HISTORY_CACHE_CONTROL = "private, max-age=30"
+
+
+def _price_history_payload(deployment_id: int, hours: int, session: Session) -> dict:
+    history = PriceMonitor().get_price_history(deployment_id, hours, session)
     return {
         "deployment_id": deployment_id,
         "hours": hours,
@@ -137,13 +117,49 @@ async def get_price_history(
                 "price_per_hour": record.price_per_hour,
                 "provider": record.provider,
                 "gpu_type": record.gpu_type,
-                "recorded_at": record.recorded_at.isoformat()
+                "recorded_at": record.recorded_at
             }
             for record in history
         ]
     }
 
 
+@router.api_route("/price-history", methods=["GET", "HEAD"])
+def get_price_history(
+    deployment_id: int,
+    request: Request,
+    response: Response,
+    hours: int = Query(168, description="Time window in hours (default: 7 days)"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get price history for a deployment.
+    Sends an ETag; a matching If-None-Match gets an empty 304.
+    """
+    # Verify ownership
+    if not _owns_deployment(session, deployment_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Deployment not found")
+    
+    result = get_cached_response("history", deployment_id, hours)
+    if result is None:
+        result = _price_history_payload(deployment_id, hours, session)
+        cache_response("history", deployment_id, hours, result)
+    
+    history = result["history"]
+    etag = make_etag(
+        deployment_id, hours,
+        history[-1]["recorded_at"] if history else None, len(history)
+    )
+    unchanged = not_modified(request, etag, PRICE_HISTORY_CACHE_CONTROL)
+    if unchanged is not None:
+        return unchanged
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PRICE_HISTORY_CACHE_CONTROL
+    return result
+
+
 @router.get("/price-trends")
 async def get_price_trends(
     deployment_id: int,
@@ -153,20 +169,25 @@ async def get_price_trends(
 ):
     """Get price trend analysis for a deployment."""
     # Verify ownership
-    deployment = session.get(Deployment, deployment_id)
-    if not deployment or deployment.user_id != current_user.id:
+    if not _owns_deployment(session, deployment_id, current_user.id):
         raise HTTPException(status_code=404, detail="Deployment not found")
     
+    cached = get_cached_response("trend", deployment_id, hours)
+    if cached is not None:
+        return cached
+    
     # Get price monitor
     price_monitor = PriceMonitor()
     
     # Get price trend
     trend = await price_monitor.get_price_trend(deployment_id, hours, session)
     
-    return {
+    result = {
         "deployment_id": deployment_id,
         **trend
     }
+    cache_response("trend", deployment_id, hours, result)
+    return result
 
 
 @router.get("/cheaper-alternatives")
@@ -177,21 +198,23 @@ async def get_cheaper_alternatives(
 ):
     """Find cheaper alternatives for a deployment."""
     # Verify ownership
-    deployment = session.get(Deployment, deployment_id)
-    if not deployment or deployment.user_id != current_user.id:
+    deployment = _get_owned(session, Deployment, deployment_id, current_user.id)
+    if not deployment:
         raise HTTPException(status_code=404, detail="Deployment not found")
     
-    # Get provider adapters using ProviderManager
-    from app.main import get_provider_adapters
-    provider_adapters = get_provider_adapters()
-    
-    # Get price monitor
-    price_monitor = PriceMonitor()
-    
-    # Check cheaper alternatives
-    alternatives = await price_monitor.check_cheaper_alternatives(
-        deployment, provider_adapters, session
-    )
+    alternatives = get_cached_response("alternatives", deployment_id)
+    if alternatives is None:
+        # Get provider adapters using ProviderManager
+        provider_adapters = get_provider_adapters()
+        
+        # Get price monitor
+        price_monitor = PriceMonitor()
+        
+        # Check cheaper alternatives
+        alternatives = await price_monitor.check_cheaper_alternatives(
+            deployment, provider_adapters, session
+        )
+        cache_response("alternatives", deployment_id, 0, alternatives)
     
     return {
         "deployment_id": deployment_id,
@@ -210,12 +233,11 @@ async def create_migration(
 ):
     """Create a new migration task."""
     # Verify ownership
-    deployment = session.get(Deployment, migration_data.source_deployment_id)
-    if not deployment or deployment.user_id != current_user.id:
+    deployment = _get_owned(session, Deployment, migration_data.source_deployment_id, current_user.id)
+    if not deployment:
         raise HTTPException(status_code=404, detail="Deployment not found")
     
     # Get provider adapters
-    from app.main import get_provider_adapters
     provider_adapters = get_provider_adapters()
     
     # Create migration
@@ -234,27 +256,27 @@ async def create_migration(
         "source_deployment_id": migration_task.source_deployment_id,
         "target_provider": migration_task.target_provider,
         "status": migration_task.status,
-        "created_at": migration_task.created_at.isoformat()
+        "created_at": migration_task.created_at
     }
 
 
 @router.get("/migrations")
-async def list_migrations(
+def list_migrations(
     limit: int = Query(50, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """List user's migration tasks."""
-    statement = (
-        select(MigrationTask)
-        .where(MigrationTask.user_id == current_user.id)
-        .order_by(MigrationTask.created_at.desc())
-        .limit(limit)
+    """List user's migration tasks, newest first."""
+    statement = apply_keyset(
+        select(MigrationTask).where(MigrationTask.user_id == current_user.id),
+        MigrationTask.created_at, MigrationTask.id, cursor, limit
     )
     
     migrations = session.exec(statement).all()
     
     return {
+        "next_cursor": next_cursor(migrations, limit, "created_at"),
         "migrations": [
             {
                 "id": m.id,
@@ -262,10 +284,10 @@ async def list_migrations(
                 "target_deployment_id": m.target_deployment_id,
                 "target_provider": m.target_provider,
                 "status": m.status,
-                "started_at": m.started_at.isoformat() if m.started_at else None,
-                "completed_at": m.completed_at.isoformat() if m.completed_at else None,
+                "started_at": m.started_at,
+                "completed_at": m.completed_at,
                 "error_message": m.error_message,
-                "created_at": m.created_at.isoformat()
+                "created_at": m.created_at
             }
             for m in migrations
         ]
@@ -273,22 +295,21 @@ async def list_migrations(
 
 
 @router.get("/migrations/{migration_id}")
-async def get_migration(
+def get_migration(
     migration_id: int,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get migration task details."""
-    migration = session.get(MigrationTask, migration_id)
+    migration = _get_owned(session, MigrationTask, migration_id, current_user.id)
     
-    if not migration or migration.user_id != current_user.id:
+    if not migration:
         raise HTTPException(status_code=404, detail="Migration not found")
     
-    import json
     steps = []
     if migration.migration_steps_json:
         try:
-            steps = json.loads(migration.migration_steps_json)
+            steps = orjson.loads(migration.migration_steps_json)
         except:
             pass
     
@@ -297,13 +318,13 @@ async def get_migration(
         "source_deployment_id": migration.source_deployment_id,
         "target_deployment_id": migration.target_deployment_id,
         "target_provider": migration.target_provider,
-        "target_config": json.loads(migration.target_config_json),
+        "target_config": orjson.loads(migration.target_config_json),
         "status": migration.status,
         "migration_steps": steps,
-        "started_at": migration.started_at.isoformat() if migration.started_at else None,
-        "completed_at": migration.completed_at.isoformat() if migration.completed_at else None,
+        "started_at": migration.started_at,
+        "completed_at": migration.completed_at,
         "error_message": migration.error_message,
-        "created_at": migration.created_at.isoformat()
+        "created_at": migration.created_at
     }
 
 
@@ -314,9 +335,9 @@ async def rollback_migration(
     current_user: User = Depends(get_current_user)
 ):
     """Rollback a migration."""
-    migration = session.get(MigrationTask, migration_id)
+    migration = _get_owned(session, MigrationTask, migration_id, current_user.id)
     
-    if not migration or migration.user_id != current_user.id:
+    if not migration:
         raise HTTPException(status_code=404, detail="Migration not found")
     
     # Can only rollback failed migrations
@@ -324,7 +345,6 @@ async def rollback_migration(
         raise HTTPException(status_code=400, detail="Can only rollback failed migrations")
     
     # Get provider adapters
-    from app.main import get_provider_adapters
     provider_adapters = get_provider_adapters()
     
     # Rollback migration
@@ -342,7 +362,7 @@ async def rollback_migration(
 # ==================== Failover Management ====================
 
 @router.get("/failover-configs")
-async def list_failover_configs(
+def list_failover_configs(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -355,20 +375,19 @@ async def list_failover_configs(
     
     configs = session.exec(statement).all()
     
-    import json
     return {
         "configs": [
             {
                 "id": c.id,
                 "deployment_id": c.deployment_id,
                 "primary_provider": c.primary_provider,
-                "backup_providers": json.loads(c.backup_providers_json),
+                "backup_providers": orjson.loads(c.backup_providers_json),
                 "health_check_interval": c.health_check_interval,
                 "failover_threshold": c.failover_threshold,
                 "auto_failover_enabled": c.auto_failover_enabled,
-                "last_failover_at": c.last_failover_at.isoformat() if c.last_failover_at else None,
+                "last_failover_at": c.last_failover_at,
                 "failover_count": c.failover_count,
-                "created_at": c.created_at.isoformat()
+                "created_at": c.created_at
             }
             for c in configs
         ]
@@ -376,15 +395,15 @@ async def list_failover_configs(
 
 
 @router.post("/failover-configs")
-async def create_failover_config(
+def create_failover_config(
     config_data: FailoverConfigCreate,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Create a failover configuration."""
     # Verify ownership
-    deployment = session.get(Deployment, config_data.deployment_id)
-    if not deployment or deployment.user_id != current_user.id:
+    deployment = _get_owned(session, Deployment, config_data.deployment_id, current_user.id)
+    if not deployment:
         raise HTTPException(status_code=404, detail="Deployment not found")
     
     # Check if config already exists
@@ -397,12 +416,11 @@ async def create_failover_config(
     if existing:
         raise HTTPException(status_code=400, detail="Failover config already exists for this deployment")
     
-    import json
     config = FailoverConfig(
         user_id=current_user.id,
         deployment_id=config_data.deployment_id,
         primary_provider=config_data.primary_provider,
-        backup_providers_json=json.dumps(config_data.backup_providers),
+        backup_providers_json=orjson.dumps(config_data.backup_providers).decode(),
         health_check_interval=config_data.health_check_interval,
         failover_threshold=config_data.failover_threshold,
         auto_failover_enabled=config_data.auto_failover_enabled,
@@ -411,38 +429,40 @@ async def create_failover_config(
     )
     
     session.add(config)
-    session.commit()
-    session.refresh(config)
+    # Flush assigns the id; build the response before commit expires the
+    # attributes so no reload SELECT is needed
+    session.flush()
     
-    return {
+    response = {
         "id": config.id,
         "deployment_id": config.deployment_id,
         "primary_provider": config.primary_provider,
-        "backup_providers": json.loads(config.backup_providers_json),
+        "backup_providers": orjson.loads(config.backup_providers_json),
         "health_check_interval": config.health_check_interval,
         "failover_threshold": config.failover_threshold,
         "auto_failover_enabled": config.auto_failover_enabled
     }
+    session.commit()
+    
+    return response
 
 
 @router.put("/failover-configs/{config_id}")
-async def update_failover_config(
+def update_failover_config(
     config_id: int,
     config_data: FailoverConfigUpdate,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Update a failover configuration."""
-    config = session.get(FailoverConfig, config_id)
+    config = _get_owned(session, FailoverConfig, config_id, current_user.id)
     
-    if not config or config.user_id != current_user.id:
+    if not config:
         raise HTTPException(status_code=404, detail="Config not found")
     
-    import json
-    
     # Update fields
     if config_data.backup_providers is not None:
-        config.backup_providers_json = json.dumps(config_data.backup_providers)
+        config.backup_providers_json = orjson.dumps(config_data.backup_providers).decode()
     
     if config_data.health_check_interval is not None:
         config.health_check_interval = config_data.health_check_interval
@@ -456,30 +476,31 @@ async def update_failover_config(
     config.updated_at = datetime.utcnow()
     
     session.add(config)
-    session.commit()
-    session.refresh(config)
     
-    return {
+    response = {
         "id": config.id,
         "deployment_id": config.deployment_id,
         "primary_provider": config.primary_provider,
-        "backup_providers": json.loads(config.backup_providers_json),
+        "backup_providers": orjson.loads(config.backup_providers_json),
         "health_check_interval": config.health_check_interval,
         "failover_threshold": config.failover_threshold,
         "auto_failover_enabled": config.auto_failover_enabled
     }
+    session.commit()
+    
+    return response
 
 
 @router.delete("/failover-configs/{config_id}")
-async def delete_failover_config(
+def delete_failover_config(
     config_id: int,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a failover configuration."""
-    config = session.get(FailoverConfig, config_id)
+    config = _get_owned(session, FailoverConfig, config_id, current_user.id)
     
-    if not config or config.user_id != current_user.id:
+    if not config:
         raise HTTPException(status_code=404, detail="Config not found")
     
     session.delete(config)
@@ -515,19 +536,20 @@ async def create_task(
         "task_type": task.task_type,
         "status": task.status,
         "priority": task.priority,
-        "scheduled_at": task.scheduled_at.isoformat(),
-        "created_at": task.created_at.isoformat()
+        "scheduled_at": task.scheduled_at,
+        "created_at": task.created_at
     }
 
 
 @router.get("/tasks")
-async def list_tasks(
+def list_tasks(
     status: Optional[str] = Query(None),
     limit: int = Query(50, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """List user's batch tasks."""
+    """List user's batch tasks, newest first."""
     statement = (
         select(BatchTask)
         .where(BatchTask.user_id == current_user.id)
@@ -536,23 +558,23 @@ async def list_tasks(
     if status:
         statement = statement.where(BatchTask.status == status)
     
-    statement = statement.order_by(BatchTask.created_at.desc()).limit(limit)
+    statement = apply_keyset(statement, BatchTask.created_at, BatchTask.id, cursor, limit)
     
     tasks = session.exec(statement).all()
     
-    import json
     return {
+        "next_cursor": next_cursor(tasks, limit, "created_at"),
         "tasks": [
             {
                 "id": t.id,
                 "task_type": t.task_type,
                 "status": t.status,
                 "priority": t.priority,
-                "scheduled_at": t.scheduled_at.isoformat(),
-                "started_at": t.started_at.isoformat() if t.started_at else None,
-                "completed_at": t.completed_at.isoformat() if t.completed_at else None,
+                "scheduled_at": t.scheduled_at,
+                "started_at": t.started_at,
+                "completed_at": t.completed_at,
                 "error_message": t.error_message,
-                "created_at": t.created_at.isoformat()
+                "created_at": t.created_at
             }
             for t in tasks
         ]
@@ -560,30 +582,28 @@ async def list_tasks(
 
 
 @router.get("/tasks/{task_id}")
-async def get_task(
+def get_task(
     task_id: int,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get task details."""
-    task = session.get(BatchTask, task_id)
+    task = _get_owned(session, BatchTask, task_id, current_user.id)
     
-    if not task or task.user_id != current_user.id:
+    if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    import json
-    
     task_config = {}
     result = {}
     
     try:
-        task_config = json.loads(task.task_config_json)
+        task_config = orjson.loads(task.task_config_json)
     except:
         pass
     
     if task.result_json:
         try:
-            result = json.loads(task.result_json)
+            result = orjson.loads(task.result_json)
         except:
             pass
     
@@ -593,12 +613,12 @@ async def get_task(
         "task_config": task_config,
         "status": task.status,
         "priority": task.priority,
-        "scheduled_at": task.scheduled_at.isoformat(),
-        "started_at": task.started_at.isoformat() if task.started_at else None,
-        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+        "scheduled_at": task.scheduled_at,
+        "started_at": task.started_at,
+        "completed_at": task.completed_at,
         "result": result,
         "error_message": task.error_message,
-        "created_at": task.created_at.isoformat()
+        "created_at": task.created_at
     }
 
 
@@ -609,9 +629,9 @@ async def cancel_task(
     current_user: User = Depends(get_current_user)
 ):
     """Cancel a queued task."""
-    task = session.get(BatchTask, task_id)
+    task = _get_owned(session, BatchTask, task_id, current_user.id)
     
-    if not task or task.user_id != current_user.id:
+    if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
     task_queue = TaskQueueManager()
@@ -1,14 +1,23 @@
 from typing import List, Optional
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, Query, Request
-from sqlmodel import Session, select, or_
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlmodel import Session, func, select, or_
 from app.core.db import get_session
+from app.core.audit_stats import get_audit_stats_snapshot
+from app.tasks.audit_writer import enqueue_audit_log
 from app.core.models import AuditLog
+from app.utils.pagination import apply_keyset, next_cursor
+from app.utils.http_cache import make_etag, not_modified
 from pydantic import BaseModel
-import json
+import orjson
 
 router = APIRouter()
 
+# Clients must revalidate every time; unchanged pages come back as 304
+AUDIT_LOGS_CACHE_CONTROL = "private, no-cache"
+
 # Helper function to create audit log
 async def create_audit_log(
     session: Session,
@@ -23,11 +32,17 @@ async def create_audit_log(
     user_agent: Optional[str] = None,
     is_admin: bool = False,
     status: str = "success",
-    error_message: Optional[str] = None
+    error_message: Optional[str] = None,
+    atomic: bool = False
 ):
     """
     Create an audit log entry.
     This function should be called whenever an important action occurs.
+    
+    atomic=True adds the entry to the session so it lands in the caller's
+    commit together with the change it records; the caller must commit.
+    Otherwise it is queued for the batched background writer, or committed
+    on its own when no writer is running (scripts, or a full queue).
     """
     log = AuditLog(
         action_type=action_type,
@@ -39,12 +54,19 @@ async def create_audit_log(
         ip_address=ip_address,
         user_agent=user_agent,
         description=description,
-        details_json=json.dumps(details) if details else None,
+        details_json=orjson.dumps(details, option=orjson.OPT_NON_STR_KEYS).decode() if details else None,
         status=status,
         error_message=error_message
     )
+    if atomic:
+        session.add(log)
+        return log
+    if enqueue_audit_log(log):
+        return log
+    
     session.add(log)
-    session.commit()
+    # Blocking commit runs off the event loop (callers are async endpoints)
+    await run_in_threadpool(session.commit)
     return log
 
 
@@ -80,23 +102,17 @@ class AuditLogDetail(BaseModel):
 
 
 # API Endpoints
+# Plain `def`: FastAPI runs them in its threadpool, so the blocking
+# Session calls don't stall the event loop
 
-@router.get("/audit/logs", response_model=List[AuditLogItem])
-async def list_audit_logs(
-    action_type: Optional[str] = Query(None, description="Filter by action type"),
-    resource_type: Optional[str] = Query(None, description="Filter by resource type"),
-    user_email: Optional[str] = Query(None, description="Filter by user email"),
-    status: Optional[str] = Query(None, description="Filter by status (success/failed)"),
-    start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
-    end_date: Optional[str] = Query(None, description="End date (ISO format)"),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=100),
-    session: Session = Depends(get_session)
+def _filtered_logs_query(
+    action_type: Optional[str],
+    resource_type: Optional[str],
+    user_email: Optional[str],
+    status: Optional[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
 ):
-    """
-    List audit logs with filtering and pagination.
-    """
-    # Build query
     query = select(AuditLog)
     
     # Apply filters
@@ -114,41 +130,82 @@ async def list_audit_logs(
     
     # Date range filter
     if start_date:
-        start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        query = query.where(AuditLog.timestamp >= start_dt)
+        query = query.where(AuditLog.timestamp >= start_date)
     
     if end_date:
-        end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-        query = query.where(AuditLog.timestamp <= end_dt)
+        query = query.where(AuditLog.timestamp <= end_date)
     
-    # Order by timestamp (most recent first)
-    query = query.order_by(AuditLog.timestamp.desc())
+    return query
+
+
+def _log_item(log: AuditLog) -> dict:
+    """AuditLogItem fields as a plain dict, serialized directly by orjson"""
+    return {
+        "id": log.id,
+        "timestamp": log.timestamp,
+        "action_type": log.action_type,
+        "resource_type": log.resource_type,
+        "resource_id": log.resource_id,
+        "user_email": log.user_email,
+        "is_admin": log.is_admin,
+        "description": log.description,
+        "status": log.status,
+        "ip_address": log.ip_address
+    }
+
+
+@router.get(
+    "/audit/logs",
+    response_model=None,
+    responses={200: {"model": List[AuditLogItem]}}
+)
+def list_audit_logs(
+    request: Request,
+    action_type: Optional[str] = Query(None, description="Filter by action type"),
+    resource_type: Optional[str] = Query(None, description="Filter by resource type"),
+    user_email: Optional[str] = Query(None, description="Filter by user email"),
+    status: Optional[str] = Query(None, description="Filter by status (success/failed)"),
+    start_date: Optional[datetime] = Query(None, description="Start date (ISO format)"),
+    end_date: Optional[datetime] = Query(None, description="End date (ISO format)"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    session: Session = Depends(get_session)
+) -> ORJSONResponse:
+    """
+    List audit logs with filtering and pagination.
+    Pass the X-Next-Cursor response header back as `cursor` for the next
+    page; `skip` is kept for existing clients but scans the skipped rows.
+    """
+    query = _filtered_logs_query(action_type, resource_type, user_email, status, start_date, end_date)
     
-    # Apply pagination
-    query = query.offset(skip).limit(limit)
+    # Most recent first, starting after the cursor row
+    query = apply_keyset(query, AuditLog.timestamp, AuditLog.id, cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
     
     logs = session.exec(query).all()
     
-    # Convert to response model
-    return [
-        AuditLogItem(
-            id=log.id,
-            timestamp=log.timestamp,
-            action_type=log.action_type,
-            resource_type=log.resource_type,
-            resource_id=log.resource_id,
-            user_email=log.user_email,
-            is_admin=log.is_admin,
-            description=log.description,
-            status=log.status,
-            ip_address=log.ip_address
-        )
-        for log in logs
-    ]
+    # Logs are append-only: the query plus the page's id range identify it
+    etag = make_etag(
+        request.url.query, len(logs),
+        logs[0].id if logs else None, logs[-1].id if logs else None
+    )
+    unchanged = not_modified(request, etag, AUDIT_LOGS_CACHE_CONTROL)
+    if unchanged is not None:
+        return unchanged
+    
+    cursor_out = next_cursor(logs, limit, "timestamp")
+    headers = {"ETag": etag, "Cache-Control": AUDIT_LOGS_CACHE_CONTROL}
+    if cursor_out:
+        headers["X-Next-Cursor"] = cursor_out
+    
+    # Rows go straight to orjson, skipping response_model validation
+    return ORJSONResponse([_log_item(log) for log in logs], headers=headers)
 
 
 @router.get("/audit/logs/{log_id}", response_model=AuditLogDetail)
-async def get_audit_log_detail(
+def get_audit_log_detail(
     log_id: int,
     session: Session = Depends(get_session)
 ):
@@ -179,43 +236,31 @@ async def get_audit_log_detail(
 
 
 @router.get("/audit/stats")
-async def get_audit_stats(
+def get_audit_stats(
     session: Session = Depends(get_session)
 ):
     """
     Get audit log statistics.
+    Totals come from the pre-aggregated snapshot.
     """
-    # Get total count
-    total_logs = len(session.exec(select(AuditLog)).all())
+    snapshot = get_audit_stats_snapshot(session)
     
-    # Get counts by action type
-    logs = session.exec(select(AuditLog)).all()
-    
-    action_types = {}
-    resource_types = {}
     status_counts = {"success": 0, "failed": 0, "error": 0}
-    
-    for log in logs:
-        # Count by action type
-        action_types[log.action_type] = action_types.get(log.action_type, 0) + 1
-        
-        # Count by resource type
-        resource_types[log.resource_type] = resource_types.get(log.resource_type, 0) + 1
-        
-        # Count by status
-        if log.status in status_counts:
-            status_counts[log.status] += 1
+    for log_status, count in snapshot["status"].items():
+        if log_status in status_counts:
+            status_counts[log_status] = count
     
     # Get recent activity (last 24 hours)
     yesterday = datetime.utcnow() - timedelta(days=1)
-    recent_logs = session.exec(
-        select(AuditLog).where(AuditLog.timestamp >= yesterday)
-    ).all()
+    recent_24h = session.exec(
+        select(func.count()).select_from(AuditLog).where(AuditLog.timestamp >= yesterday)
+    ).one()
     
     return {
-        "total_logs": total_logs,
-        "recent_24h": len(recent_logs),
-        "by_action_type": action_types,
-        "by_resource_type": resource_types,
+        # Every log has an action type, so this is the table total
+        "total_logs": sum(snapshot["action_type"].values()),
+        "recent_24h": recent_24h,
+        "by_action_type": snapshot["action_type"],
+        "by_resource_type": snapshot["resource_type"],
         "by_status": status_counts
     }
@@ -13,7 +13,7 @@ from sqlmodel import Session, select
 from pydantic import BaseModel
 
 from app.core.db import get_session
-from app.core.auth import verify_token
+from app.core.auth import verify_token, resolve_clerk_user
 from app.core.models import User, Deployment
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -26,38 +26,7 @@ def get_current_user(
     token = credentials.credentials
     payload = verify_token(token, session)
     
-    clerk_id = payload.get("sub")
-    if not clerk_id:
-        raise HTTPException(status_code=401, detail="Invalid token: missing sub")
-        
-    # Lazy User Creation / Sync
-    user = session.exec(select(User).where(User.clerk_id == clerk_id)).first()
-    
-    if not user:
-        email = payload.get("email")
-        if not email:
-            email = f"{clerk_id}@clerk.user" 
-            
-        existing_email_user = session.exec(select(User).where(User.email == email)).first()
-        if existing_email_user:
-            existing_email_user.clerk_id = clerk_id
-            existing_email_user.auth_provider = "clerk"
-            session.add(existing_email_user)
-            session.commit()
-            session.refresh(existing_email_user)
-            return existing_email_user
-        
-        user = User(
-            email=email,
-            clerk_id=clerk_id,
-            auth_provider="clerk",
-            plan="free"
-        )
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        
-    return user
+    return resolve_clerk_user(payload, session)
 
 from app.core.automation_models import (
     AutomationRule,
@@ -11,7 +11,7 @@ from app.services.notification_service import get_notification_service
 router = APIRouter()
 
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.core.auth import verify_token
+from app.core.auth import verify_token, resolve_clerk_user
 
 security = HTTPBearer()
 
@@ -26,39 +26,7 @@ def get_current_user(
         payload = verify_token(token, session)
         print(f"[DEBUG] Token verified, payload: {payload}")
         
-        clerk_id = payload.get("sub")
-        if not clerk_id:
-            print("[ERROR] Invalid token: missing sub")
-            raise HTTPException(status_code=401, detail="Invalid token: missing sub")
-            
-        # Lazy User Creation / Sync
-        user = session.exec(select(User).where(User.clerk_id == clerk_id)).first()
-        
-        if not user:
-            email = payload.get("email")
-            if not email:
-                email = f"{clerk_id}@clerk.user" 
-                
-            existing_email_user = session.exec(select(User).where(User.email == email)).first()
-            if existing_email_user:
-                existing_email_user.clerk_id = clerk_id
-                existing_email_user.auth_provider = "clerk"
-                session.add(existing_email_user)
-                session.commit()
-                session.refresh(existing_email_user)
-                print(f"[DEBUG] Updated existing user: {existing_email_user.email}")
-                return existing_email_user
-            
-            user = User(
-                email=email,
-                clerk_id=clerk_id,
-                auth_provider="clerk",
-                plan="free"
-            )
-            session.add(user)
-            session.commit()
-            session.refresh(user)
-            print(f"[DEBUG] Created new user: {user.email}")
+        user = resolve_clerk_user(payload, session)
         
         print(f"[DEBUG] Returning user: {user.email}, id: {user.id}")
         return user
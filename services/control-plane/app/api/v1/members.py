@@ -8,7 +8,7 @@ POS: API layer for team collaboration - member management
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
 
@@ -397,11 +397,12 @@ async def remove_member(
     
     # Cannot remove yourself if you're the last admin
     if user_id == current_user.id:
-        admin_count = len(session.exec(
-            select(OrganizationMember)
+        admin_count = session.exec(
+            select(func.count())
+            .select_from(OrganizationMember)
             .where(OrganizationMember.organization_id == organization_id)
             .where(OrganizationMember.role.in_([OrganizationRole.OWNER.value, OrganizationRole.ADMIN.value]))
-        ).all())
+        ).one()
         
         if admin_count <= 1:
             raise HTTPException(
@@ -5,7 +5,7 @@ Handles notification settings, history, and Telegram binding
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 import secrets
@@ -351,7 +351,7 @@ async def get_notification_history(
         statement = statement.where(NotificationHistory.status == status)
     
     # Get total count
-    count_statement = select(NotificationHistory).where(
+    count_statement = select(func.count()).select_from(NotificationHistory).where(
         NotificationHistory.user_id == current_user.clerk_id
     )
     if channel:
@@ -359,7 +359,7 @@ async def get_notification_history(
     if status:
         count_statement = count_statement.where(NotificationHistory.status == status)
     
-    total = len(session.exec(count_statement).all())
+    total = session.exec(count_statement).one()
     
     # Get items
     statement = statement.order_by(NotificationHistory.created_at.desc())
@@ -8,7 +8,7 @@ POS: API layer for team collaboration - organization management
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 from datetime import datetime
 
 from app.core.db import get_session
@@ -184,17 +184,19 @@ async def list_organizations(
             continue
         
         # Count members
-        member_count = len(session.exec(
-            select(OrganizationMember)
+        member_count = session.exec(
+            select(func.count())
+            .select_from(OrganizationMember)
             .where(OrganizationMember.organization_id == org.id)
-        ).all())
+        ).one()
         
         # Count projects
         from app.core.team_models import Project
-        project_count = len(session.exec(
-            select(Project)
+        project_count = session.exec(
+            select(func.count())
+            .select_from(Project)
             .where(Project.organization_id == org.id)
-        ).all())
+        ).one()
         
         result.append(OrganizationWithStats(
             id=org.id,
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException
@@ -55,10 +56,8 @@ async def compare_prices(
             "error": "No providers configured"
         }
     
-    # Fetch prices from all providers
-    provider_prices = []
-    
-    for provider in providers:
+    # Fetch prices from all providers concurrently
+    async def fetch_one(provider: Provider) -> Dict[str, Any]:
         try:
             adapter = ProviderManager.get_adapter(provider.type, session)
             price = await adapter.get_pricing(gpu_type)
@@ -67,26 +66,28 @@ async def compare_prices(
             display_name = provider.name
             is_test = provider.type == "local"
             
-            provider_prices.append({
+            return {
                 "name": provider.type,
                 "display_name": display_name,
                 "price_per_hour": price,
                 "available": price is not None,
                 "currency": "USD",
                 "is_test": is_test
-            })
+            }
         except Exception as e:
             print(f"[Pricing] Failed to get price from {provider.type}: {e}")
             import traceback
             traceback.print_exc()
-            provider_prices.append({
+            return {
                 "name": provider.type,
                 "display_name": provider.name,
                 "price_per_hour": None,
                 "available": False,
                 "currency": "USD",
                 "is_test": provider.type == "local"
-            })
+            }
+    
+    provider_prices = list(await asyncio.gather(*(fetch_one(p) for p in providers)))
     
     # Sort by price (None values go to end)
     provider_prices.sort(key=lambda x: (x["price_per_hour"] is None, x["price_per_hour"] or float('inf')))
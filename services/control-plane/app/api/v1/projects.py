@@ -8,7 +8,7 @@ POS: API layer for team collaboration - project management
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -104,10 +104,11 @@ async def list_projects(
     result = []
     for project in projects:
         # Count deployments
-        deployment_count = len(session.exec(
-            select(Deployment)
+        deployment_count = session.exec(
+            select(func.count())
+            .select_from(Deployment)
             .where(Deployment.project_id == project.id)
-        ).all())
+        ).one()
         
         result.append(ProjectWithStats(
             id=project.id,
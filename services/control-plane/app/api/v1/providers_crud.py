@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
@@ -49,10 +49,14 @@ class ProviderResponse(BaseModel):
 
 @router.get("/providers", response_model=List[Provider])
 async def list_providers(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
     session: Session = Depends(get_session)
 ):
-    """List all providers."""
-    providers = session.exec(select(Provider)).all()
+    """List providers, ordered by id."""
+    providers = session.exec(
+        select(Provider).order_by(Provider.id).offset(skip).limit(limit)
+    ).all()
     return providers
 
 @router.get("/providers/{provider_id}", response_model=Provider)
@@ -81,11 +85,11 @@ async def create_provider(
     
     provider = Provider(**provider_data.model_dump())
     session.add(provider)
-    session.commit()
-    session.refresh(provider)
+    # Assigns provider.id for the audit entry
+    session.flush()
     
-    # Create audit log
-    create_audit_log(
+    # Create audit log (committed together with the provider)
+    await create_audit_log(
         session=session,
         action_type="CREATE",
         resource_type="provider",
@@ -94,8 +98,11 @@ async def create_provider(
         user_email="admin@system",
         is_admin=True,
         description=f"Created provider: {provider.name}",
-        status="success"
+        status="success",
+        atomic=True
     )
+    session.commit()
+    session.refresh(provider)
     
     return provider
 
@@ -117,11 +124,9 @@ async def update_provider(
     
     provider.updated_at = datetime.utcnow()
     session.add(provider)
-    session.commit()
-    session.refresh(provider)
     
-    # Create audit log
-    create_audit_log(
+    # Create audit log (committed together with the update)
+    await create_audit_log(
         session=session,
         action_type="UPDATE",
         resource_type="provider",
@@ -130,9 +135,13 @@ async def update_provider(
         user_email="admin@system",
         is_admin=True,
         description=f"Updated provider: {provider.name}",
-        details_json=str(update_data),
-        status="success"
+        # Field names only: the values may include the API key
+        details={"fields": sorted(update_data)},
+        status="success",
+        atomic=True
     )
+    session.commit()
+    session.refresh(provider)
     
     return provider
 
@@ -148,10 +157,9 @@ async def delete_provider(
     
     provider_name = provider.name
     session.delete(provider)
-    session.commit()
     
-    # Create audit log
-    create_audit_log(
+    # Create audit log (committed together with the delete)
+    await create_audit_log(
         session=session,
         action_type="DELETE",
         resource_type="provider",
@@ -160,7 +168,9 @@ async def delete_provider(
         user_email="admin@system",
         is_admin=True,
         description=f"Deleted provider: {provider_name}",
-        status="success"
+        status="success",
+        atomic=True
     )
+    session.commit()
     
     return {"message": "Provider deleted successfully"}
@@ -2,6 +2,7 @@
 Public pricing API endpoints for GPU price dashboard
 No authentication required - public facing
 """
+import asyncio
 from typing import List, Optional
 from fastapi import APIRouter, Depends
 from sqlmodel import Session, select, func
@@ -37,29 +38,29 @@ class PriceHistoryPoint(BaseModel):
 
 
 async def fetch_gpu_prices_from_providers(gpu_type: str, session: Session) -> List[ProviderPrice]:
-    """Fetch prices from all enabled providers"""
+    """Fetch prices from all enabled providers concurrently"""
     providers = session.exec(select(Provider).where(Provider.is_enabled == True)).all()
-    provider_prices = []
     
-    for provider in providers:
+    async def fetch_one(provider: Provider) -> ProviderPrice:
         try:
             adapter = ProviderManager.get_adapter(provider.type.value, session)
             price = await adapter.get_pricing(gpu_type)
             
-            provider_prices.append(ProviderPrice(
+            return ProviderPrice(
                 provider=provider.type.value,
                 price_per_hour=price,
                 available=price is not None
-            ))
+            )
         except Exception as e:
             print(f"Error fetching price from {provider.type}: {e}")
-            provider_prices.append(ProviderPrice(
+            return ProviderPrice(
                 provider=provider.type.value,
                 price_per_hour=None,
                 available=False
-            ))
+            )
     
-    return provider_prices
+    # 并发请求, 共享 HTTP/2 连接多路复用
+    return list(await asyncio.gather(*(fetch_one(p) for p in providers)))
 
 
 @router.get("/public/gpu-prices", response_model=List[GPUPriceComparison])
@@ -72,10 +73,16 @@ async def get_all_gpu_prices(session: Session = Depends(get_session)):
     gpu_types = ["A100", "H100", "RTX 4090", "L40S", "A6000", "RTX 3090"]
     results = []
     
-    for gpu in gpu_types:
+    # Fetch every GPU type at once; failures are handled per GPU below
+    all_prices = await asyncio.gather(
+        *(fetch_gpu_prices_from_providers(gpu, session) for gpu in gpu_types),
+        return_exceptions=True
+    )
+    
+    for gpu, provider_prices in zip(gpu_types, all_prices):
         try:
-            # Get current prices from all providers
-            provider_prices = await fetch_gpu_prices_from_providers(gpu, session)
+            if isinstance(provider_prices, Exception):
+                raise provider_prices
             
             # Find best price
             best_price = None
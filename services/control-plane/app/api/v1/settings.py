@@ -1,7 +1,8 @@
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
-from app.core.db import get_session
+from app.core.db import get_session, upsert_settings
+from app.api.v1.admin import invalidate_public_config
 from app.core.models import SystemSetting
 from pydantic import BaseModel
 import json
@@ -169,16 +170,20 @@ async def init_default_settings(session: Session):
 @router.get("/settings", response_model=List[SettingItem])
 async def get_all_settings(
     include_secrets: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
     session: Session = Depends(get_session)
 ):
     """
-    Get all system settings.
+    Get system settings, ordered by key.
     Secrets are masked unless include_secrets=true.
     """
     # Initialize defaults if needed
     await init_default_settings(session)
     
-    settings = session.exec(select(SystemSetting)).all()
+    settings = session.exec(
+        select(SystemSetting).order_by(SystemSetting.key).offset(skip).limit(limit)
+    ).all()
     
     result = []
     for setting in settings:
@@ -226,30 +231,20 @@ async def update_setting(
     update: SettingUpdate,
     session: Session = Depends(get_session)
 ):
-    """Update a specific setting."""
-    setting = session.get(SystemSetting, key)
-    
-    if not setting:
-        # Create new setting if it doesn't exist
-        setting = SystemSetting(
-            key=key,
-            value=update.value,
-            description=None,
-            is_secret=False
-        )
-        session.add(setting)
-    else:
-        setting.value = update.value
-        session.add(setting)
-    
+    """Update a specific setting (created if it doesn't exist)."""
+    setting, = upsert_settings(
+        session,
+        [{"key": key, "value": update.value, "description": None, "is_secret": False}]
+    )
+    value = setting.value
     session.commit()
-    session.refresh(setting)
+    invalidate_public_config(key)
     
     return {
         "ok": True,
         "message": f"Setting '{key}' updated successfully",
-        "key": setting.key,
-        "value": setting.value
+        "key": key,
+        "value": value
     }
 
 
@@ -258,31 +253,22 @@ async def bulk_update_settings(
     updates: BulkSettingUpdate,
     session: Session = Depends(get_session)
 ):
-    """Update multiple settings at once."""
+    """Update multiple settings at once (a single upsert statement)."""
     updated = []
     failed = []
     
-    for key, value in updates.settings.items():
-        try:
-            setting = session.get(SystemSetting, key)
-            
-            if not setting:
-                setting = SystemSetting(
-                    key=key,
-                    value=value,
-                    description=None,
-                    is_secret=False
-                )
-                session.add(setting)
-            else:
-                setting.value = value
-                session.add(setting)
-            
-            updated.append(key)
-        except Exception as e:
-            failed.append({"key": key, "error": str(e)})
-    
-    session.commit()
+    try:
+        upsert_settings(session, [
+            {"key": key, "value": value, "description": None, "is_secret": False}
+            for key, value in updates.settings.items()
+        ])
+        session.commit()
+        updated = list(updates.settings)
+        for key in updated:
+            invalidate_public_config(key)
+    except Exception as e:
+        session.rollback()
+        failed = [{"key": key, "error": str(e)} for key in updates.settings]
     
     return {
         "ok": True,
@@ -1,7 +1,7 @@
 from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 from pydantic import BaseModel
 
 from app.core.db import get_session
@@ -149,9 +149,9 @@ async def list_my_tickets(
     # Get reply counts
     result = []
     for ticket in tickets:
-        reply_count = len(session.exec(
-            select(TicketReply).where(TicketReply.ticket_id == ticket.id)
-        ).all())
+        reply_count = session.exec(
+            select(func.count()).select_from(TicketReply).where(TicketReply.ticket_id == ticket.id)
+        ).one()
         
         result.append(TicketListItem(
             id=ticket.id,
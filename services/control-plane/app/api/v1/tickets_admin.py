@@ -246,10 +246,8 @@ async def update_ticket(
     
     ticket.updated_at = datetime.utcnow()
     session.add(ticket)
-    session.commit()
-    session.refresh(ticket)
     
-    # Create audit log
+    # Create audit log (committed together with the ticket update)
     if changes:
         await create_audit_log(
             session=session,
@@ -261,8 +259,10 @@ async def update_ticket(
             user_id="admin",  # TODO: Get from auth
             user_email="admin@computehub.com",
             is_admin=True,
-            status="success"
+            status="success",
+            atomic=True
         )
+    session.commit()
     
     # Get replies for response
     replies = session.exec(
@@ -323,10 +323,10 @@ async def reply_to_ticket(
     ticket.updated_at = datetime.utcnow()
     session.add(ticket)
     
-    session.commit()
-    session.refresh(ticket_reply)
+    # Assigns ticket_reply.id for the audit entry
+    session.flush()
     
-    # Create audit log
+    # Create audit log (committed together with the reply)
     await create_audit_log(
         session=session,
         action_type="CREATE",
@@ -337,8 +337,10 @@ async def reply_to_ticket(
         user_id="admin",
         user_email="admin@computehub.com",
         is_admin=True,
-        status="success"
+        status="success",
+        atomic=True
     )
+    session.commit()
     
     return TicketReplyResponse(
         id=ticket_reply.id,
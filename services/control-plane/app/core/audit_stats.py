@@ -0,0 +1,91 @@
+"""
+Pre-aggregated audit log statistics
+
+/admin/audit/stats reads per-value StatsCounter rows instead of grouping the
+whole audit_log table on every dashboard poll. ORM inserts and deletes of
+AuditLog, and the batched writes of app.tasks.audit_writer, add their deltas
+to those rows atomically in the same transaction; rebuild_audit_stats()
+recomputes them from scratch (first read, and a scheduled job to correct
+drift from writes that bypass both).
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+
+from app.core.db import engine
+from app.core.models import AuditLog, AuditStatsSnapshot
+from app.core.stats_counters import increment_counters, replace_counters, read_counters
+
+SNAPSHOT_ID = 1
+
+# Counter dimension -> AuditLog column it counts
+_DIMENSIONS = {
+    "audit.action_type": AuditLog.action_type,
+    "audit.resource_type": AuditLog.resource_type,
+    "audit.status": AuditLog.status,
+}
+
+
+def rebuild_audit_stats(session: Session) -> AuditStatsSnapshot:
+    """Recompute the counters with grouped queries (not committed)"""
+    connection = session.connection()
+    for dimension, column in _DIMENSIONS.items():
+        counts = dict(session.exec(select(column, func.count()).group_by(column)).all())
+        replace_counters(connection, dimension, counts)
+
+    snapshot = session.get(AuditStatsSnapshot, SNAPSHOT_ID) or AuditStatsSnapshot(id=SNAPSHOT_ID)
+    snapshot.updated_at = datetime.utcnow()
+    session.add(snapshot)
+    return snapshot
+
+
+def get_audit_stats_snapshot(session: Session) -> Dict[str, Dict[str, int]]:
+    """Return counts per AuditLog column name, building them on first use"""
+    if session.get(AuditStatsSnapshot, SNAPSHOT_ID) is None:
+        try:
+            rebuild_audit_stats(session)
+            session.commit()
+        except IntegrityError:
+            # Another request built them concurrently; use theirs
+            session.rollback()
+    return {
+        column.key: read_counters(session, dimension)
+        for dimension, column in _DIMENSIONS.items()
+    }
+
+
+def refresh_audit_stats():
+    """Scheduled drift correction: rebuild the counters from audit_log"""
+    try:
+        with Session(engine) as session:
+            rebuild_audit_stats(session)
+            session.commit()
+    except Exception as e:
+        print(f"[AuditStats] Rebuild failed: {e}")
+
+
+def record_audit_rows(connection, rows: List[Dict[str, Any]], delta: int = 1):
+    """
+    Add the counts of `rows` (AuditLog column dicts) to the counters. Bulk
+    inserts bypass the mapper events and call this directly.
+    """
+    counts = Counter()
+    for log in rows:
+        for dimension, column in _DIMENSIONS.items():
+            counts[dimension, log[column.key]] += delta
+    increment_counters(connection, counts)
+
+
+@event.listens_for(AuditLog, "after_insert")
+def _audit_log_inserted(mapper, connection, target):
+    record_audit_rows(connection, [target.model_dump()])
+
+
+@event.listens_for(AuditLog, "after_delete")
+def _audit_log_deleted(mapper, connection, target):
+    record_audit_rows(connection, [target.model_dump()], delta=-1)
@@ -2,14 +2,20 @@
 import jwt
 import requests
 import os
+import time
 from jwt.algorithms import RSAAlgorithm
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
-from app.core.models import SystemSetting
+from app.core.models import SystemSetting, User
 
 # Cache for JWKS keys to avoid fetching on every request
 _jwks_cache = {}
 
+# clerk_id -> (user id, monotonic expires_at). Only the id is cached; the row
+# itself is re-read by primary key, so plan changes are seen immediately.
+CLERK_USER_CACHE_TTL_SECONDS = 300
+_clerk_user_cache: dict[str, tuple[int, float]] = {}
+
 def get_clerk_issuer() -> str:
     """Get Clerk issuer URL from environment variable"""
     # Try to get from CLERK_ISSUER_URL env var first
@@ -129,3 +135,60 @@ def get_current_user_id(token: str, session: Session) -> str:
             detail="User ID not found in token"
         )
     return user_id
+
+
+def _cache_clerk_user(clerk_id: str, user_id: int, token_exp) -> None:
+    ttl = CLERK_USER_CACHE_TTL_SECONDS
+    if token_exp:
+        ttl = min(ttl, token_exp - time.time())
+    if ttl > 0:
+        _clerk_user_cache[clerk_id] = (user_id, time.monotonic() + ttl)
+
+
+def resolve_clerk_user(payload: dict, session: Session) -> User:
+    """
+    Map a verified Clerk token payload to the local User, creating or
+    linking it on first sight.
+    
+    Repeat requests within the token lifetime skip the clerk_id/email
+    lookups and load the user by primary key.
+    """
+    clerk_id = payload.get("sub")
+    if not clerk_id:
+        raise HTTPException(status_code=401, detail="Invalid token: missing sub")
+    
+    cached = _clerk_user_cache.get(clerk_id)
+    if cached and cached[1] > time.monotonic():
+        user = session.get(User, cached[0])
+        if user and user.clerk_id == clerk_id:
+            return user
+    _clerk_user_cache.pop(clerk_id, None)
+    
+    # Lazy User Creation / Sync
+    user = session.exec(select(User).where(User.clerk_id == clerk_id)).first()
+    
+    if not user:
+        email = payload.get("email")
+        if not email:
+            email = f"{clerk_id}@clerk.user"
+        
+        user = session.exec(select(User).where(User.email == email)).first()
+        if user:
+            user.clerk_id = clerk_id
+            user.auth_provider = "clerk"
+        else:
+            user = User(
+                email=email,
+                clerk_id=clerk_id,
+                auth_provider="clerk",
+                plan="free"
+            )
+        session.add(user)
+        # The id comes back from the INSERT; the row reloads lazily on use
+        session.flush()
+        _cache_clerk_user(clerk_id, user.id, payload.get("exp"))
+        session.commit()
+        return user
+    
+    _cache_clerk_user(clerk_id, user.id, payload.get("exp"))
+    return user
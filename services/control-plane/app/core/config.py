@@ -5,6 +5,10 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = None
+    # Connection pool (PostgreSQL); sized for the threadpool that runs sync endpoints
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_SECONDS: int = 1800
     
     # PostgreSQL (optional, only if not using DATABASE_URL)
     POSTGRES_SERVER: str = "localhost"
@@ -13,6 +17,7 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "computehub"
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_URL: str = ""  # e.g. redis://localhost:6379/0 - enables the shared provider cache
     
     # MinIO
     MINIO_ENDPOINT: str = "localhost:9000"
@@ -23,6 +28,7 @@ class Settings(BaseSettings):
     # Security & Env
     SECRET_KEY: str = "supersecret"
     ENVIRONMENT: str = "development"
+    LOG_LEVEL: str = ""  # defaults to INFO in development, WARNING otherwise
 
     # Provider API Keys
     RUNPOD_API_KEY: str = ""
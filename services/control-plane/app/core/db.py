@@ -1,6 +1,9 @@
+from typing import Any, Dict, List, Sequence
+from sqlalchemy import func
 from sqlmodel import SQLModel, create_engine, Session
 from app.core.config import settings
 from app.core.models import (
+    SystemSetting,
     User, Deployment, TaskLog, Usage, DeploymentTemplate, 
     NotificationSettings, NotificationHistory,  # Notification models
     TemplateCategory  # Template category enum
@@ -16,7 +19,15 @@ else:
 if "sqlite" in DATABASE_URL:
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, echo=False)
 else:
-    engine = create_engine(DATABASE_URL, echo=False)
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        # Drop connections the server or a proxy closed while idle
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        echo=False
+    )
 
 def init_db():
     SQLModel.metadata.create_all(engine)
@@ -33,3 +44,58 @@ def init_db():
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+def upsert_settings(
+    session: Session,
+    rows: List[Dict[str, Any]],
+    update_columns: Sequence[str] = ("value",),
+    keep_existing: Sequence[str] = ()
+) -> List[SystemSetting]:
+    """
+    Insert or update SystemSetting rows in one INSERT ... ON CONFLICT (key)
+    DO UPDATE statement and return the stored rows (not committed).
+    
+    update_columns: columns overwritten on conflict.
+    keep_existing: of those, columns that keep their stored value when the
+    new one is NULL.
+    """
+    if not rows:
+        return []
+    
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        # No native upsert: read-then-write per row
+        stored = []
+        for row in rows:
+            setting = session.get(SystemSetting, row["key"])
+            if setting is None:
+                setting = SystemSetting(**row)
+            else:
+                for column in update_columns:
+                    if column in keep_existing and row.get(column) is None:
+                        continue
+                    setattr(setting, column, row.get(column))
+            session.add(setting)
+            stored.append(setting)
+        session.flush()
+        return stored
+    
+    stmt = insert(SystemSetting).values(rows)
+    table = SystemSetting.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.key],
+        set_={
+            column: (
+                func.coalesce(stmt.excluded[column], table.c[column])
+                if column in keep_existing
+                else stmt.excluded[column]
+            )
+            for column in update_columns
+        }
+    ).returning(SystemSetting)
+    return list(session.scalars(stmt, execution_options={"populate_existing": True}))
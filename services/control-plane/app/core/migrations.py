@@ -219,9 +219,117 @@ def migrate_deployment_postgresql():
     else:
         print("[MIGRATION] project_id column already exists")
 
+# Indexes added to existing tables after their creation (same names SQLModel
+# generates for index=True, so fresh databases already have them)
+ACTIVITY_INDEXES = [
+    ("ix_user_created_at", '"user"', "created_at"),
+    ("ix_deployment_created_at", "deployment", "created_at"),
+    ("ix_deployment_user_id", "deployment", "user_id"),
+]
+
+def migrate_add_activity_indexes():
+    """Index created_at / user_id for the recent-activity and per-user queries"""
+    
+    try:
+        inspector = inspect(engine)
+        tables = inspector.get_table_names()
+        
+        with engine.begin() as conn:
+            for index_name, table, column in ACTIVITY_INDEXES:
+                if table.strip('"') not in tables:
+                    continue
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({column})"
+                ))
+        print("[MIGRATION] Activity indexes ensured")
+            
+    except Exception as e:
+        print(f"[MIGRATION ERROR] Failed to create activity indexes: {e}")
+
+# Indexes for hot WHERE filters: (name, table, column, partial-index predicate)
+FILTER_INDEXES = [
+    ("ix_user_plan", '"user"', "plan", None),
+    ("ix_deployment_status", "deployment", "status", None),
+    ("ix_provider_is_enabled", "provider", "is_enabled", None),
+    ("ix_deployment_running", "deployment", "id", "status = 'RUNNING'"),
+]
+
+def _create_missing_indexes(indexes) -> set:
+    """
+    Create the (name, table, columns, predicate) indexes that do not exist
+    yet and ANALYZE the tables that got one. Returns those tables.
+    """
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    analyze = set()
+    
+    with engine.begin() as conn:
+        for index_name, table, columns, where in indexes:
+            table_name = table.strip('"')
+            if table_name not in tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table_name)}
+            if index_name in existing:
+                continue
+            predicate = f" WHERE {where}" if where else ""
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({columns}){predicate}"
+            ))
+            analyze.add(table)
+        
+        # Refresh planner statistics so the new indexes get picked up
+        for table in analyze:
+            conn.execute(text(f"ANALYZE {table}"))
+    
+    return analyze
+
+def migrate_add_filter_indexes():
+    """Index plan / status / is_enabled filters, then ANALYZE the changed tables"""
+    
+    try:
+        analyze = _create_missing_indexes(FILTER_INDEXES)
+        if analyze:
+            print(f"[MIGRATION] Filter indexes created on {len(analyze)} table(s)")
+            
+    except Exception as e:
+        print(f"[MIGRATION ERROR] Failed to create filter indexes: {e}")
+
+# Audit log filters combined with the timestamp DESC sort of /audit/logs
+AUDIT_INDEXES = [
+    ("ix_audit_action_ts", "auditlog", "action_type, timestamp", None),
+    ("ix_audit_resource_ts", "auditlog", "resource_type, timestamp", None),
+    ("ix_audit_status_ts", "auditlog", "status, timestamp", None),
+]
+
+def migrate_add_audit_indexes():
+    """Composite audit log indexes, plus a trigram index for email search on PostgreSQL"""
+    
+    try:
+        if _create_missing_indexes(AUDIT_INDEXES):
+            print("[MIGRATION] Audit log indexes created")
+    except Exception as e:
+        print(f"[MIGRATION ERROR] Failed to create audit log indexes: {e}")
+    
+    if engine.dialect.name != "postgresql":
+        return
+    
+    # user_email is filtered with LIKE '%...%', which only a trigram index serves
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_audit_email_trgm "
+                "ON auditlog USING gin (user_email gin_trgm_ops)"
+            ))
+    except Exception as e:
+        print(f"[MIGRATION ERROR] Failed to create audit email trigram index: {e}")
+
 def run_migrations():
     """Run all pending migrations"""
     print("[MIGRATION] Running database migrations...")
     migrate_add_is_pro_column()
     migrate_add_organization_project_columns()
+    migrate_add_activity_indexes()
+    migrate_add_filter_indexes()
+    migrate_add_audit_indexes()
     print("[MIGRATION] Migrations complete")
@@ -1,5 +1,6 @@
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel
 from enum import Enum
 
@@ -40,17 +41,26 @@ class User(SQLModel, table=True):
     email: str = Field(index=True, unique=True)
     clerk_id: Optional[str] = Field(default=None, index=True, unique=True)
     auth_provider: str = "email"  # email, google, github
-    plan: str = "free"  # free, pro, enterprise
+    plan: str = Field(default="free", index=True)  # free, pro, enterprise
     preferences_json: Optional[str] = None  # JSON string for user preferences
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
 class Deployment(SQLModel, table=True):
+    # Running deployments are a small slice of the table; index just those rows
+    __table_args__ = (
+        Index(
+            "ix_deployment_running", "id",
+            sqlite_where=text("status = 'RUNNING'"),
+            postgresql_where=text("status = 'RUNNING'")
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     name: str
     provider: ProviderType  # Keep for backward compatibility
     provider_id: Optional[int] = Field(default=None, foreign_key="provider.id")  # New foreign key
-    status: DeploymentStatus = DeploymentStatus.CREATING
+    status: DeploymentStatus = Field(default=DeploymentStatus.CREATING, index=True)
     gpu_type: str
     gpu_count: int = 1
     endpoint_url: Optional[str] = None
@@ -78,7 +88,7 @@ class Deployment(SQLModel, table=True):
     organization_id: Optional[int] = Field(default=None, foreign_key="organization.id", index=True)
     project_id: Optional[int] = Field(default=None, foreign_key="project.id", index=True)
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class TaskLog(SQLModel, table=True):
@@ -111,7 +121,7 @@ class Provider(SQLModel, table=True):
     type: ProviderType
     api_key: Optional[str] = None
     config_json: Optional[str] = None  # JSON string for extra config (region, etc.)
-    is_enabled: bool = True
+    is_enabled: bool = Field(default=True, index=True)
     weight: int = 100  # Priority weight for AUTO provider selection
     display_name: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -145,11 +155,48 @@ class SystemSetting(SQLModel, table=True):
     is_secret: bool = False
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class StatsCounter(SQLModel, table=True):
+    """
+    Pre-aggregated row count for one value of a counted column, e.g.
+    ("deployment.status", "running"). Maintained with atomic increments by
+    app.core.stats_counters.
+    """
+    __tablename__ = "stats_counter"
+    
+    dimension: str = Field(primary_key=True)  # user.plan, deployment.status, ...
+    value: str = Field(primary_key=True)
+    count: int = 0
+
+class PlatformStatsSnapshot(SQLModel, table=True):
+    """
+    Admin dashboard totals that are rebuilt rather than kept current: the row
+    (id=1) marks the user/deployment counters as built, and holds the total
+    uptime from the last rebuild by app.core.platform_stats.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    total_uptime_seconds: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class AuditStatsSnapshot(SQLModel, table=True):
+    """
+    Marks the audit log counters (StatsCounter rows) as built.
+    A single row (id=1), rebuilt by app.core.audit_stats.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
 class AuditLog(SQLModel, table=True):
     """
     Audit log for tracking all admin and user actions.
     Used for compliance, security monitoring, and debugging.
     """
+    # Each /audit/logs filter paired with its timestamp DESC sort
+    __table_args__ = (
+        Index("ix_audit_action_ts", "action_type", "timestamp"),
+        Index("ix_audit_resource_ts", "resource_type", "timestamp"),
+        Index("ix_audit_status_ts", "status", "timestamp"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
     
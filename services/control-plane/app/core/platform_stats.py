@@ -0,0 +1,148 @@
+"""
+Pre-aggregated platform statistics
+
+The admin dashboard reads per-plan user counts and per-status deployment
+counts from StatsCounter rows instead of aggregating the user and deployment
+tables on every poll. ORM flushes of User and Deployment add their deltas to
+those rows atomically in the same transaction. Total uptime changes on every
+status poll, so it is not maintained per write: rebuild_platform_stats()
+recomputes it together with the counters (first read, and an hourly job that
+also corrects drift from writes that bypass the ORM).
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import event, inspect, select as sa_select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+
+from app.core.db import engine
+from app.core.models import User, Deployment, PlatformStatsSnapshot
+from app.core.stats_counters import increment_counters, replace_counters, read_counters
+
+SNAPSHOT_ID = 1
+
+PLAN_DIMENSION = "user.plan"
+STATUS_DIMENSION = "deployment.status"
+
+
+def _status_key(status) -> str:
+    return getattr(status, "value", status)
+
+
+def rebuild_platform_stats(session: Session) -> PlatformStatsSnapshot:
+    """Recompute the counters and total uptime with grouped queries (not committed)"""
+    plan_counts = dict(session.exec(
+        select(User.plan, func.count()).group_by(User.plan)
+    ).all())
+    deployment_rows = session.exec(
+        select(
+            Deployment.status,
+            func.count(),
+            func.coalesce(func.sum(Deployment.uptime_seconds), 0)
+        ).group_by(Deployment.status)
+    ).all()
+    status_counts = {_status_key(status): count for status, count, _ in deployment_rows}
+
+    connection = session.connection()
+    replace_counters(connection, PLAN_DIMENSION, plan_counts)
+    replace_counters(connection, STATUS_DIMENSION, status_counts)
+
+    snapshot = session.get(PlatformStatsSnapshot, SNAPSHOT_ID) or PlatformStatsSnapshot(id=SNAPSHOT_ID)
+    snapshot.total_uptime_seconds = sum(uptime for _, _, uptime in deployment_rows)
+    snapshot.updated_at = datetime.utcnow()
+    session.add(snapshot)
+    return snapshot
+
+
+def get_platform_stats_snapshot(session: Session) -> Dict[str, Any]:
+    """
+    Return users_by_plan, deployments_by_status and total_uptime_seconds,
+    building the counters on first use.
+    """
+    snapshot = session.get(PlatformStatsSnapshot, SNAPSHOT_ID)
+    if snapshot is None:
+        try:
+            snapshot = rebuild_platform_stats(session)
+            session.commit()
+        except IntegrityError:
+            # Another request built it concurrently; use theirs
+            session.rollback()
+            snapshot = session.get(PlatformStatsSnapshot, SNAPSHOT_ID)
+    return {
+        "users_by_plan": read_counters(session, PLAN_DIMENSION),
+        "deployments_by_status": read_counters(session, STATUS_DIMENSION),
+        "total_uptime_seconds": snapshot.total_uptime_seconds,
+    }
+
+
+def refresh_platform_stats():
+    """Scheduled rebuild: refresh total uptime and correct counter drift"""
+    try:
+        with Session(engine) as session:
+            rebuild_platform_stats(session)
+            session.commit()
+    except Exception as e:
+        print(f"[PlatformStats] Rebuild failed: {e}")
+
+
+def _change(connection, target, attr: str):
+    """
+    (old, new) for a changed attribute, or None if it did not change. Runs
+    before the UPDATE, so when the attribute was expired before assignment
+    (no old value in memory) the stored value can still be read.
+    """
+    history = inspect(target).attrs[attr].history
+    if not history.has_changes():
+        return None
+    new = history.added[0] if history.added else None
+    if history.deleted:
+        return history.deleted[0], new
+    column = getattr(type(target), attr)
+    old = connection.execute(
+        sa_select(column).where(type(target).id == target.id)
+    ).scalar()
+    return old, new
+
+
+@event.listens_for(User, "after_insert")
+def _user_inserted(mapper, connection, target):
+    increment_counters(connection, {(PLAN_DIMENSION, target.plan): 1})
+
+
+@event.listens_for(User, "before_update")
+def _user_updated(mapper, connection, target):
+    change = _change(connection, target, "plan")
+    if change and change[0] != change[1]:
+        increment_counters(connection, {
+            (PLAN_DIMENSION, change[0]): -1,
+            (PLAN_DIMENSION, change[1]): 1
+        })
+
+
+@event.listens_for(User, "before_delete")
+def _user_deleted(mapper, connection, target):
+    increment_counters(connection, {(PLAN_DIMENSION, target.plan): -1})
+
+
+@event.listens_for(Deployment, "after_insert")
+def _deployment_inserted(mapper, connection, target):
+    increment_counters(connection, {(STATUS_DIMENSION, _status_key(target.status)): 1})
+
+
+@event.listens_for(Deployment, "before_update")
+def _deployment_updated(mapper, connection, target):
+    change = _change(connection, target, "status")
+    if change:
+        old, new = (_status_key(s) for s in change)
+        if old != new:
+            increment_counters(connection, {
+                (STATUS_DIMENSION, old): -1,
+                (STATUS_DIMENSION, new): 1
+            })
+
+
+@event.listens_for(Deployment, "before_delete")
+def _deployment_deleted(mapper, connection, target):
+    increment_counters(connection, {(STATUS_DIMENSION, _status_key(target.status)): -1})
@@ -4,10 +4,25 @@ from app.adapters.base import ProviderAdapter
 from app.adapters.local_adapter import LocalAdapter
 from app.adapters.runpod_adapter import RunPodAdapter
 from app.adapters.vast_adapter import VastAdapter
+from app.core.db import engine
 from app.core.models import ProviderType, Provider
 
 class ProviderManager:
     _adapters = {}
+    # Adapters whose instances share one class-level HTTP pool per provider host
+    _pooled_adapters = (RunPodAdapter, VastAdapter)
+
+    @classmethod
+    def open_clients(cls):
+        """Build every provider's shared HTTP pool (called on application startup)"""
+        for adapter_cls in cls._pooled_adapters:
+            adapter_cls.open()
+
+    @classmethod
+    async def aclose_clients(cls):
+        """Close every provider's shared HTTP pool (called on application shutdown)"""
+        for adapter_cls in cls._pooled_adapters:
+            await adapter_cls.aclose()
 
     @classmethod
     def get_adapter(cls, provider_type: str, session: Optional[Session] = None, user_api_key: Optional[str] = None) -> ProviderAdapter:
@@ -104,3 +119,22 @@ class ProviderManager:
             
         # Fallback
         return ProviderType.RUNPOD
+
+
+def get_provider_adapters():
+    """
+    Get all available provider adapters for advanced automation tasks.
+    Returns a dictionary of provider_type -> adapter instance.
+    """
+    adapters = {}
+    
+    with Session(engine) as session:
+        # Get adapters for all known provider types
+        for provider_type in [ProviderType.RUNPOD, ProviderType.VAST]:
+            try:
+                adapter = ProviderManager.get_adapter(provider_type, session)
+                adapters[provider_type] = adapter
+            except Exception as e:
+                print(f"[ProviderAdapters] Failed to load adapter for {provider_type}: {e}")
+    
+    return adapters
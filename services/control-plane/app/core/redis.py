@@ -0,0 +1,96 @@
+"""
+Optional Redis client
+Shared cache across uvicorn workers; disabled unless REDIS_URL is set and
+the redis package is installed.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+redis_client = (
+    aioredis.from_url(settings.REDIS_URL)
+    if REDIS_AVAILABLE and settings.REDIS_URL
+    else None
+)
+
+# Cross-worker fetch lock: expiry, and how long other workers wait on it
+SHARED_LOCK_MS = 5000
+SHARED_LOCK_WAIT_SECONDS = 2.0
+SHARED_LOCK_POLL_SECONDS = 0.05
+
+
+async def _shared_get(key: str) -> Optional[Any]:
+    try:
+        raw = await redis_client.get(key)
+    except Exception as e:
+        logger.warning("Redis get %s failed: %s", key, e)
+        return None
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def shared_fetch(key: str, ttl: int, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Read-through cache shared by all workers.
+    
+    On a miss one worker takes a SETNX lock and calls fetch(); the others
+    wait briefly for its result before fetching themselves. Falsy results are
+    not cached. Without Redis this is just `await fetch()`.
+    """
+    if redis_client is None:
+        return await fetch()
+    
+    value = await _shared_get(key)
+    if value is not None:
+        return value
+    
+    lock_key = f"{key}:lock"
+    try:
+        acquired = await redis_client.set(lock_key, "1", nx=True, px=SHARED_LOCK_MS)
+    except Exception as e:
+        logger.warning("Redis lock %s failed: %s", lock_key, e)
+        return await fetch()
+    
+    if not acquired:
+        # Another worker is fetching; wait for it to publish
+        waited = 0.0
+        while waited < SHARED_LOCK_WAIT_SECONDS:
+            await asyncio.sleep(SHARED_LOCK_POLL_SECONDS)
+            waited += SHARED_LOCK_POLL_SECONDS
+            value = await _shared_get(key)
+            if value is not None:
+                return value
+    
+    try:
+        value = await fetch()
+        if value:
+            try:
+                await redis_client.setex(key, ttl, orjson.dumps(value))
+            except Exception as e:
+                logger.warning("Redis set %s failed: %s", key, e)
+        return value
+    finally:
+        if acquired:
+            try:
+                await redis_client.delete(lock_key)
+            except Exception:
+                pass
+
+
+async def close_redis():
+    """Close the Redis connection pool (called on application shutdown)"""
+    if redis_client is not None:
+        await redis_client.aclose()
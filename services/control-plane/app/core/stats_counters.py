@@ -0,0 +1,76 @@
+"""
+Pre-aggregated row counts for the admin statistics
+
+Each StatsCounter row counts one value of one column, keyed by
+(dimension, value) - e.g. ("user.plan", "pro"). Writers add deltas with a
+single INSERT ... ON CONFLICT DO UPDATE SET count = count + delta, so
+concurrent flushes never read, lock and rewrite a shared row.
+"""
+
+from typing import Dict, Tuple
+
+from sqlalchemy import delete, update, insert as sa_insert
+from sqlmodel import Session, select
+
+from app.core.models import StatsCounter
+
+_table = StatsCounter.__table__
+
+
+def _upsert(connection, rows, accumulate: bool):
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        # No native upsert: atomic UPDATE, INSERT when the row is new
+        for row in rows:
+            count = _table.c.count + row["count"] if accumulate else row["count"]
+            result = connection.execute(
+                update(_table)
+                .where(_table.c.dimension == row["dimension"], _table.c.value == row["value"])
+                .values(count=count)
+            )
+            if result.rowcount == 0:
+                connection.execute(sa_insert(_table).values(**row))
+        return
+
+    stmt = insert(_table).values(rows)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[_table.c.dimension, _table.c.value],
+        set_={"count": _table.c.count + stmt.excluded.count if accumulate else stmt.excluded.count}
+    ))
+
+
+def increment_counters(connection, deltas: Dict[Tuple[str, str], int]):
+    """Add deltas keyed by (dimension, value) in one statement"""
+    rows = [
+        {"dimension": dimension, "value": value, "count": delta}
+        for (dimension, value), delta in deltas.items()
+        if delta and value is not None
+    ]
+    if rows:
+        _upsert(connection, rows, accumulate=True)
+
+
+def replace_counters(connection, dimension: str, counts: Dict[str, int]):
+    """Overwrite one dimension with freshly computed counts"""
+    counts = {value: count for value, count in counts.items() if value is not None}
+    connection.execute(
+        delete(_table).where(_table.c.dimension == dimension, _table.c.value.not_in(counts))
+    )
+    if counts:
+        _upsert(
+            connection,
+            [{"dimension": dimension, "value": value, "count": count} for value, count in counts.items()],
+            accumulate=False
+        )
+
+
+def read_counters(session: Session, dimension: str) -> Dict[str, int]:
+    """value -> count for one dimension, leaving out values with no rows"""
+    return dict(session.exec(
+        select(StatsCounter.value, StatsCounter.count)
+        .where(StatsCounter.dimension == dimension, StatsCounter.count > 0)
+    ).all())
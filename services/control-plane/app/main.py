@@ -5,10 +5,20 @@ import os
 load_dotenv()
 print(f"[STARTUP] ENCRYPTION_KEY loaded: {bool(os.getenv('ENCRYPTION_KEY'))}")
 
+import logging
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
 from fastapi.middleware.cors import CORSMiddleware
 
+# Application loggers (app.*); uvicorn configures its own
+logging.basicConfig(
+    level=settings.LOG_LEVEL.upper() or ("INFO" if settings.ENVIRONMENT == "development" else "WARNING"),
+    format="[%(name)s] %(levelname)s: %(message)s"
+)
+# httpx logs request URLs at INFO, and the RunPod URL carries the API key
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
 app = FastAPI(
     title="ComputeHub API",
     description="""
@@ -32,6 +42,8 @@ app = FastAPI(
 Most endpoints require authentication via Clerk JWT token in the `Authorization` header.
     """,
     version="0.9.0",
+    # orjson encodes datetimes natively and is much faster on large lists
+    default_response_class=ORJSONResponse,
     openapi_url="/api/v1/openapi.json",
     docs_url="/api/v1/docs",
     contact={
@@ -57,6 +69,14 @@ async def on_startup():
     from app.core.db import init_db
     init_db()
     
+    # Shared provider HTTP pools (closed in on_shutdown)
+    from app.core.provider_manager import ProviderManager
+    ProviderManager.open_clients()
+    
+    # Batched audit log writes (flushed in on_shutdown)
+    from app.tasks.audit_writer import start_audit_writer
+    start_audit_writer()
+    
     # Start Telegram bot (optional)
     try:
         import asyncio
@@ -72,15 +92,17 @@ async def on_startup():
     
     # Start background scheduler for deployment status sync
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
-    from app.tasks.sync_deployments import sync_deployment_status, mark_stale_deployments
+    from app.tasks.sync_deployments import (
+        sync_deployment_status, mark_stale_deployments, SYNC_TICK_SECONDS
+    )
     
     scheduler = AsyncIOScheduler()
     
-    # Sync deployment status every 30 seconds
+    # Sync deployment status (per-deployment intervals follow provider hints)
     scheduler.add_job(
         sync_deployment_status,
         'interval',
-        seconds=30,
+        seconds=SYNC_TICK_SECONDS,
         id='sync_deployments',
         name='Sync Deployment Status'
     )
@@ -94,6 +116,27 @@ async def on_startup():
         name='Mark Stale Deployments'
     )
     
+    # Rebuild the pre-aggregated platform stats hourly (total uptime is only
+    # recomputed here; it also corrects counter drift)
+    from app.core.platform_stats import refresh_platform_stats
+    scheduler.add_job(
+        refresh_platform_stats,
+        'interval',
+        hours=1,
+        id='rebuild_platform_stats',
+        name='Rebuild Platform Stats'
+    )
+    
+    # Rebuild the audit log counters behind /admin/audit/stats hourly
+    from app.core.audit_stats import refresh_audit_stats
+    scheduler.add_job(
+        refresh_audit_stats,
+        'interval',
+        hours=1,
+        id='rebuild_audit_stats',
+        name='Rebuild Audit Stats'
+    )
+    
     scheduler.start()
     app.state.scheduler = scheduler
     print("[STARTUP] Background scheduler started")
@@ -124,30 +167,23 @@ async def on_shutdown():
     from app.tasks.automation_tasks import stop_automation_tasks
     stop_automation_tasks()
     print("[SHUTDOWN] Automation tasks stopped")
+    
+    # Write out queued audit logs
+    from app.tasks.audit_writer import stop_audit_writer
+    await stop_audit_writer()
+    print("[SHUTDOWN] Audit log writer stopped")
+    
+    # Close shared provider HTTP pools
+    from app.core.provider_manager import ProviderManager
+    await ProviderManager.aclose_clients()
+    print("[SHUTDOWN] Provider HTTP clients closed")
+    
+    from app.core.redis import close_redis
+    await close_redis()
 
 
-def get_provider_adapters():
-    """
-    Get all available provider adapters for advanced automation tasks.
-    Returns a dictionary of provider_type -> adapter instance.
-    """
-    from app.core.provider_manager import ProviderManager
-    from app.core.models import ProviderType
-    from app.core.db import get_session
-    
-    adapters = {}
-    
-    # Get a database session
-    with next(get_session()) as session:
-        # Get adapters for all known provider types
-        for provider_type in [ProviderType.RUNPOD, ProviderType.VAST]:
-            try:
-                adapter = ProviderManager.get_adapter(provider_type, session)
-                adapters[provider_type] = adapter
-            except Exception as e:
-                print(f"[ProviderAdapters] Failed to load adapter for {provider_type}: {e}")
-    
-    return adapters
+# Re-exported for callers that still import it from here
+from app.core.provider_manager import get_provider_adapters
 
 
 @app.get("/health")
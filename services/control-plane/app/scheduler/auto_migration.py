@@ -310,8 +310,9 @@ class MigrationManager:
         )
         rules = session.exec(statement).all()
         
-        migration_tasks = []
-        
+        # Collect eligible deployments first so their prices can be fetched
+        # concurrently
+        candidates = []
         for rule in rules:
             try:
                 deployment = session.get(Deployment, rule.deployment_id)
@@ -325,12 +326,26 @@ class MigrationManager:
                 if not max_price or not target_provider:
                     continue
                 
-                # Get current price
                 current_adapter = provider_adapters.get(deployment.provider)
                 if not current_adapter:
                     continue
                 
-                current_price = await current_adapter.get_pricing(deployment.gpu_type)
+                candidates.append((rule, deployment, current_adapter, max_price, target_provider))
+                
+            except Exception as e:
+                print(f"[MigrationManager] Error checking migration trigger for rule {rule.id}: {e}")
+        
+        # Get current prices
+        prices = await ProviderAdapter.gather_pricing(
+            [(adapter, deployment.gpu_type) for _, deployment, adapter, _, _ in candidates]
+        )
+        
+        migration_tasks = []
+        
+        for (rule, deployment, _, max_price, target_provider), current_price in zip(candidates, prices):
+            try:
+                if isinstance(current_price, Exception):
+                    raise current_price
                 if current_price is None:
                     continue
                 
@@ -7,8 +7,9 @@ Pos: Phase 9 Week 2 价格监控核心,被 advanced_automation_tasks 定时调
 """
 
 import asyncio
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from sqlmodel import Session, select
 
 from app.core.models import Deployment, DeploymentStatus
@@ -16,6 +17,32 @@ from app.core.automation_models import PriceHistory, AutomationRule, AutomationL
 from app.adapters.base import ProviderAdapter
 
 
+# 价格接口响应缓存 / API response cache: (kind, deployment_id, hours) -> (payload, expires_at)
+# Cleared for a deployment whenever a new price point is recorded for it
+PRICE_RESPONSE_TTL_SECONDS = {"history": 60, "trend": 300, "alternatives": 120}
+_response_cache: Dict[Tuple[str, int, int], Tuple[Any, float]] = {}
+
+
+def get_cached_response(kind: str, deployment_id: int, hours: int = 0) -> Optional[Any]:
+    """Return the cached price endpoint payload if it has not expired"""
+    entry = _response_cache.get((kind, deployment_id, hours))
+    if entry and time.monotonic() < entry[1]:
+        return entry[0]
+    return None
+
+
+def cache_response(kind: str, deployment_id: int, hours: int, payload: Any):
+    _response_cache[(kind, deployment_id, hours)] = (
+        payload, time.monotonic() + PRICE_RESPONSE_TTL_SECONDS[kind]
+    )
+
+
+def invalidate_price_cache(deployment_id: int):
+    """Drop every cached price payload for a deployment"""
+    for key in [key for key in _response_cache if key[1] == deployment_id]:
+        _response_cache.pop(key, None)
+
+
 class PriceMonitor:
     """
     Price monitoring for deployments.
@@ -93,6 +120,7 @@ class PriceMonitor:
                     session.commit()
                     session.refresh(price_record)
                     price_records.append(price_record)
+                    invalidate_price_cache(deployment.id)
                     
                     print(f"[PriceMonitor] Recorded price change for deployment {deployment.id}: ${current_price}/hr")
                     
@@ -273,30 +301,38 @@ class PriceMonitor:
         if not current_adapter:
             return []
         
-        current_price = await current_adapter.get_pricing(deployment.gpu_type)
+        # Query the current and all other providers at once
+        others = [
+            (name, adapter) for name, adapter in provider_adapters.items()
+            if name != deployment.provider
+        ]
+        prices = await ProviderAdapter.gather_pricing(
+            [(current_adapter, deployment.gpu_type)]
+            + [(adapter, deployment.gpu_type) for _, adapter in others]
+        )
+        
+        current_price = prices[0]
+        if isinstance(current_price, Exception):
+            raise current_price
         if current_price is None:
             return []
         
-        # Check all other providers
         alternatives = []
-        for provider_name, adapter in provider_adapters.items():
-            if provider_name == deployment.provider:
-                continue  # Skip current provider
+        for (provider_name, _), price in zip(others, prices[1:]):
+            if isinstance(price, Exception):
+                print(f"[PriceMonitor] Error checking {provider_name} pricing: {price}")
+                continue
             
-            try:
-                price = await adapter.get_pricing(deployment.gpu_type)
-                if price is not None and price < current_price:
-                    savings_per_hour = current_price - price
-                    savings_percent = (savings_per_hour / current_price) * 100
-                    
-                    alternatives.append({
-                        "provider": provider_name,
-                        "price_per_hour": price,
-                        "savings_percent": round(savings_percent, 2),
-                        "savings_per_hour": round(savings_per_hour, 2)
-                    })
-            except Exception as e:
-                print(f"[PriceMonitor] Error checking {provider_name} pricing: {e}")
+            if price is not None and price < current_price:
+                savings_per_hour = current_price - price
+                savings_percent = (savings_per_hour / current_price) * 100
+                
+                alternatives.append({
+                    "provider": provider_name,
+                    "price_per_hour": price,
+                    "savings_percent": round(savings_percent, 2),
+                    "savings_per_hour": round(savings_per_hour, 2)
+                })
         
         # Sort by savings (highest first)
         alternatives.sort(key=lambda x: x["savings_per_hour"], reverse=True)
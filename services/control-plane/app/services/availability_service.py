@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from sqlmodel import Session, select
 from app.core.models import GPUAvailabilityCache
 from app.core.provider_manager import ProviderManager
+from app.adapters.base import ProviderAdapterTemplate
 import json
 import os
 
@@ -44,6 +45,7 @@ class AvailabilityService:
             providers = ["local", "runpod", "vast"]
         
         results = {}
+        pending = {}
         
         for provider in providers:
             try:
@@ -53,24 +55,42 @@ class AvailabilityService:
                 if cached:
                     results[provider] = cached
                 else:
-                    # Fetch from provider API
-                    fresh = await self._fetch_availability(provider, gpu_type)
-                    results[provider] = fresh
-                    # Cache the result
-                    self._cache_availability(provider, gpu_type, fresh)
+                    pending[provider] = ProviderManager.get_adapter(provider, self.session)
             except Exception as e:
-                print(f"[ERROR] Failed to check availability for {provider}: {e}")
-                results[provider] = {
-                    "available": False,
-                    "count": 0,
-                    "price_per_hour": 0,
-                    "regions": [],
-                    "error": str(e),
-                    "cached": False,
-                    "checked_at": datetime.utcnow().isoformat()
-                }
-        
-        return results
+                results[provider] = self._error_result(provider, e)
+        
+        # Fetch all cache misses from provider APIs concurrently
+        fetched = await ProviderAdapterTemplate.gather_availability(list(pending.values()), gpu_type)
+        
+        for provider, availability in zip(pending, fetched):
+            if isinstance(availability, Exception):
+                results[provider] = self._error_result(
+                    provider, Exception(f"Failed to fetch availability from {provider}: {availability}")
+                )
+                continue
+            
+            fresh = self._format_availability(availability)
+            results[provider] = fresh
+            try:
+                # Cache the result
+                self._cache_availability(provider, gpu_type, fresh)
+            except Exception as e:
+                print(f"[ERROR] Failed to cache availability for {provider}: {e}")
+        
+        # Preserve the requested provider order
+        return {provider: results[provider] for provider in providers}
+    
+    def _error_result(self, provider: str, error: Exception) -> dict:
+        print(f"[ERROR] Failed to check availability for {provider}: {error}")
+        return {
+            "available": False,
+            "count": 0,
+            "price_per_hour": 0,
+            "regions": [],
+            "error": str(error),
+            "cached": False,
+            "checked_at": datetime.utcnow().isoformat()
+        }
     
     def _get_cached_availability(
         self,
@@ -98,28 +118,16 @@ class AvailabilityService:
         
         return None
     
-    async def _fetch_availability(
-        self,
-        provider: str,
-        gpu_type: str
-    ) -> dict:
-        """Fetch fresh availability from provider"""
-        try:
-            adapter = ProviderManager.get_adapter(provider, self.session)
-            
-            # Call provider-specific availability check
-            availability = await adapter.check_gpu_availability(gpu_type)
-            
-            return {
-                "available": availability.get("available", False),
-                "count": availability.get("count", 0),
-                "price_per_hour": availability.get("price", 0),
-                "regions": availability.get("regions", []),
-                "cached": False,
-                "checked_at": datetime.utcnow().isoformat()
-            }
-        except Exception as e:
-            raise Exception(f"Failed to fetch availability from {provider}: {e}")
+    def _format_availability(self, availability: dict) -> dict:
+        """Normalize an adapter availability response"""
+        return {
+            "available": availability.get("available", False),
+            "count": availability.get("count", 0),
+            "price_per_hour": availability.get("price", 0),
+            "regions": availability.get("regions", []),
+            "cached": False,
+            "checked_at": datetime.utcnow().isoformat()
+        }
     
     def _cache_availability(
         self,
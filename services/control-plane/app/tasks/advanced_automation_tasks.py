@@ -11,6 +11,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
 
 from app.core.db import get_session
+from app.core.provider_manager import get_provider_adapters
 from app.scheduler.price_monitor import PriceMonitor
 from app.scheduler.auto_migration import MigrationManager
 from app.scheduler.failover_manager import FailoverManager
@@ -32,7 +33,6 @@ async def price_monitoring_task():
     print(f"[AdvancedTask] Running price monitoring at {datetime.utcnow()}")
     
     try:
-        from app.main import get_provider_adapters
         provider_adapters = get_provider_adapters()
         
         with next(get_session()) as session:
@@ -52,7 +52,6 @@ async def migration_check_task():
     print(f"[AdvancedTask] Running migration check at {datetime.utcnow()}")
     
     try:
-        from app.main import get_provider_adapters
         provider_adapters = get_provider_adapters()
         
         with next(get_session()) as session:
@@ -73,7 +72,6 @@ async def failover_check_task():
     print(f"[AdvancedTask] Running failover check at {datetime.utcnow()}")
     
     try:
-        from app.main import get_provider_adapters
         provider_adapters = get_provider_adapters()
         
         with next(get_session()) as session:
@@ -95,7 +93,6 @@ async def task_queue_processor():
     
     try:
         # Get provider adapters
-        from app.main import get_provider_adapters
         provider_adapters = get_provider_adapters()
         
         with next(get_session()) as session:
@@ -0,0 +1,102 @@
+"""
+Input: AuditLog 记录(create_audit_log 入队)
+Output: 批量写入 audit_log 表
+Pos: 审计日志后台写入器,在 app.main 启动时运行,每 200ms 或满 100 条批量提交一次
+
+一旦我被更新,务必更新我的开头注释,以及所属的文件夹的 README.md
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.core.models import AuditLog
+from app.core.audit_stats import record_audit_rows
+
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.2
+AUDIT_FLUSH_BATCH_SIZE = 100
+# Past this, create_audit_log falls back to writing inline
+AUDIT_QUEUE_MAX_SIZE = 10000
+
+_queue: Optional[asyncio.Queue] = None
+_task: Optional[asyncio.Task] = None
+
+
+def enqueue_audit_log(log: AuditLog) -> bool:
+    """
+    Queue a log for the next batch. Returns False when the writer is not
+    running or the queue is full, so the caller writes it itself.
+    """
+    if _queue is None:
+        return False
+    try:
+        _queue.put_nowait(log.model_dump(exclude={"id"}))
+    except asyncio.QueueFull:
+        return False
+    return True
+
+
+def _write_batch(rows: List[Dict[str, Any]]):
+    # One multi-row INSERT and one commit for the whole batch
+    with Session(engine) as session:
+        session.execute(insert(AuditLog), rows)
+        record_audit_rows(session.connection(), rows)
+        session.commit()
+
+
+async def _flush(rows: List[Dict[str, Any]]):
+    try:
+        await run_in_threadpool(_write_batch, rows)
+    except Exception as e:
+        print(f"[AuditWriter] Failed to write {len(rows)} audit logs: {e}")
+
+
+async def _run():
+    loop = asyncio.get_running_loop()
+    while True:
+        rows = [await _queue.get()]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL_SECONDS
+        try:
+            while len(rows) < AUDIT_FLUSH_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Shutting down: don't drop the batch being collected
+            await _flush(rows)
+            raise
+        await _flush(rows)
+
+
+def start_audit_writer():
+    """Start batching audit log writes (call from the running event loop)"""
+    global _queue, _task
+    _queue = asyncio.Queue(maxsize=AUDIT_QUEUE_MAX_SIZE)
+    _task = asyncio.create_task(_run())
+
+
+async def stop_audit_writer():
+    """Stop the writer and flush whatever is still queued"""
+    global _queue, _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    
+    rows = []
+    while not _queue.empty():
+        rows.append(_queue.get_nowait())
+    _queue, _task = None, None
+    if rows:
+        await _flush(rows)
@@ -11,6 +11,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
 
 from app.core.db import get_session
+from app.core.provider_manager import get_provider_adapters
 from app.scheduler.health_checker import HealthChecker
 from app.scheduler.auto_restart import AutoRestartManager
 from app.scheduler.cost_monitor import CostMonitor
@@ -205,7 +206,6 @@ async def cost_limit_check_task():
     print(f"[Task] Running cost limit check at {datetime.utcnow()}")
     
     try:
-        from app.main import get_provider_adapters
         provider_adapters = get_provider_adapters()
         
         with next(get_session()) as session:
@@ -228,7 +228,6 @@ async def rule_engine_task():
     print(f"[Task] Running rule engine at {datetime.utcnow()}")
     
     try:
-        from app.main import get_provider_adapters
         provider_adapters = get_provider_adapters()
         
         with next(get_session()) as session:
@@ -1,11 +1,16 @@
 """
 Deployment Status Synchronization Task
 
-Polls provider APIs every 30 seconds to update deployment status and endpoint URLs.
+Polls provider APIs to update deployment status and endpoint URLs. The job
+ticks every SYNC_TICK_SECONDS; each deployment is re-polled only once the
+interval suggested by its last status response (suggested_poll_seconds) has
+elapsed, falling back to DEFAULT_POLL_SECONDS for providers without a hint.
 """
 
 import asyncio
+import time
 from datetime import datetime, timedelta
+from typing import Dict
 from sqlmodel import Session, select
 from app.core.db import engine
 from app.core.models import Deployment, DeploymentStatus
@@ -14,6 +19,14 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+SYNC_TICK_SECONDS = 10
+DEFAULT_POLL_SECONDS = 30
+# Wait after a failed poll before trying that deployment again
+ERROR_RETRY_SECONDS = 60
+
+# deployment id -> monotonic time of the next allowed poll
+_next_poll_at: Dict[int, float] = {}
+
 
 async def sync_deployment_status():
     """
@@ -36,18 +49,28 @@ async def sync_deployment_status():
                 )
             ).all()
             
+            # Forget deployments that are no longer being synced
+            for stale_id in _next_poll_at.keys() - {d.id for d in deployments}:
+                del _next_poll_at[stale_id]
+            
             if not deployments:
                 return
             
             logger.info(f"🔄 Syncing {len(deployments)} deployment(s)...")
             
-            # Process each deployment
-            for deployment in deployments:
-                try:
-                    await sync_single_deployment(session, deployment)
-                except Exception as e:
-                    logger.error(f"❌ Error syncing deployment {deployment.id}: {str(e)}")
-                    continue
+            # Poll every deployment that is due concurrently so providers
+            # can batch the status requests
+            now = time.monotonic()
+            due = [d for d in deployments if _next_poll_at.get(d.id, 0) <= now]
+            results = await asyncio.gather(
+                *(sync_single_deployment(session, deployment) for deployment in due),
+                return_exceptions=True
+            )
+            for deployment, result in zip(due, results):
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Error syncing deployment {deployment.id}: {str(result)}")
+                    # Back off instead of hitting a failing provider every tick
+                    _next_poll_at[deployment.id] = now + ERROR_RETRY_SECONDS
             
             # Commit all changes
             session.commit()
@@ -74,6 +97,11 @@ async def sync_single_deployment(session: Session, deployment: Deployment):
             deployment.exposed_port or 8888  # Default port if not set
         )
         
+        # Back off according to the provider's hint
+        _next_poll_at[deployment.id] = time.monotonic() + status_info.get(
+            "suggested_poll_seconds", DEFAULT_POLL_SECONDS
+        )
+        
         # Extract status
         new_status = status_info.get("status", "unknown")
         
@@ -0,0 +1,43 @@
+"""
+Keyset (cursor) pagination helpers
+
+A cursor encodes the (timestamp, id) of the last row of a page. The next
+page is the rows strictly after it in (timestamp DESC, id DESC) order, so
+each page is an index range read no matter how deep it is.
+"""
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlmodel import and_, or_
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    return f"{timestamp.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        timestamp, row_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(statement, timestamp_column, id_column, cursor: Optional[str], limit: int):
+    """Order newest first and restrict to the page after `cursor`"""
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            timestamp_column < cursor_ts,
+            and_(timestamp_column == cursor_ts, id_column < cursor_id)
+        ))
+    return statement.order_by(timestamp_column.desc(), id_column.desc()).limit(limit)
+
+
+def next_cursor(rows: Sequence[Any], limit: int, timestamp_attr: str) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page"""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, timestamp_attr), last.id)
@@ -0,0 +1,31 @@
+"""
+Shared database engine for standalone migration scripts
+
+Scripts import get_engine() instead of building their own engine so the
+DATABASE_URL is parsed and the dialect loaded once per process.
+"""
+
+import os
+from functools import lru_cache
+
+from sqlmodel import create_engine
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def get_database_url():
+    return os.getenv("DATABASE_URL", "sqlite:///./test.db")
+
+@lru_cache(maxsize=1)
+def get_engine():
+    """Return the memoized migration engine (single pooled connection)"""
+    database_url = get_database_url()
+    if "sqlite" in database_url:
+        return create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            pool_size=1,
+            pool_pre_ping=True,
+            echo=False
+        )
+    return create_engine(database_url, pool_size=1, pool_pre_ping=True, echo=False)